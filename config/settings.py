@@ -3,47 +3,95 @@ Moonshot Bot Configuration
 All parameters defined in the planning phase
 """
 import os
-from typing import List, Dict
-from dotenv import load_dotenv
+import sys
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, FrozenSet, Final
+
+
+def _load_env(path: str):
+    """Load KEY=VALUE lines from a .env file without overriding the real environment"""
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                key, _, value = line.partition("=")
+                value = value.strip()
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                    value = value[1:-1]
+                os.environ.setdefault(key.strip(), value)
+    except OSError:
+        pass
+
+
+# Load environment variables from .env file (project root)
+_load_env(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+# Snapshot the environment once; every setting below reads from this dict
+_ENV: Dict[str, str] = dict(os.environ)
+
+
+def _env(key: str, default: str) -> str:
+    """Read a value from the environment snapshot"""
+    return _ENV.get(key, default)
+
+
+def _envf(key: str, default: str) -> float:
+    """Read a float from the environment snapshot"""
+    return float(_ENV.get(key, default))
+
+
+def _envi(key: str, default: str) -> int:
+    """Read an int from the environment snapshot"""
+    return int(_ENV.get(key, default))
 
-# Load environment variables from .env file
-load_dotenv()
 
 # =============================================================================
 # ACCOUNT CONFIGURATION
 # =============================================================================
 
-INITIAL_EQUITY = float(os.getenv("INITIAL_EQUITY", "30.0"))
-CURRENCY = "USDT"
+INITIAL_EQUITY = _envf("INITIAL_EQUITY", "30.0")
+CURRENCY = sys.intern("USDT")
 
 # =============================================================================
 # POSITION SIZING
 # =============================================================================
 
 class PositionSizingConfig:
+    __slots__ = ()
+
     # MINIMUM $10 NOTIONAL per trade (Binance requirement)
     # With CROSSED margin, we can open more positions with shared margin
     MIN_NOTIONAL_USD = 10.0  # $10 minimum notional per trade (Binance min)
-    MIN_MARGIN_USD = float(os.getenv("MIN_MARGIN_USD", "0.50"))  # Margin calculated from notional/leverage
-    MAX_MARGIN_PERCENT = float(os.getenv("MAX_MARGIN_PERCENT", "15.0"))  # 15% max per trade (more aggressive)
-    MAX_CONCURRENT_TRADES = int(os.getenv("MAX_CONCURRENT_TRADES", "34"))  # All coins
+    MIN_MARGIN_USD = _envf("MIN_MARGIN_USD", "0.50")  # Margin calculated from notional/leverage
+    MAX_MARGIN_PERCENT = _envf("MAX_MARGIN_PERCENT", "15.0")  # 15% max per trade (more aggressive)
+    MAX_CONCURRENT_TRADES = _envi("MAX_CONCURRENT_TRADES", "34")  # All coins
     RECALC_EQUITY_CHANGE_PERCENT = 10.0  # Recalculate when equity changes ±10%
     RECALC_MAX_HOURS = 24  # Force recalculate every 24 hours
 
+# Derived once at import so sizing math doesn't divide by 100 on every call
+MAX_MARGIN_FRACTION = PositionSizingConfig.MAX_MARGIN_PERCENT / 100.0
+RECALC_EQUITY_CHANGE_FRACTION = PositionSizingConfig.RECALC_EQUITY_CHANGE_PERCENT / 100.0
+
 # =============================================================================
 # LEVERAGE
 # =============================================================================
 
 class LeverageConfig:
-    DEFAULT = int(os.getenv("DEFAULT_LEVERAGE", "15"))
+    __slots__ = ()
+
+    DEFAULT = _envi("DEFAULT_LEVERAGE", "15")
     MIN = 10
-    MAX = int(os.getenv("MAX_LEVERAGE", "20"))
+    MAX = _envi("MAX_LEVERAGE", "20")
 
 # =============================================================================
 # FEES
 # =============================================================================
 
 class FeesConfig:
+    __slots__ = ()
+
     MAKER = 0.0002  # 0.02%
     TAKER = 0.0005  # 0.05%
 
@@ -52,6 +100,8 @@ class FeesConfig:
 # =============================================================================
 
 class FundingConfig:
+    __slots__ = ()
+
     CHECK_INTERVAL_MINUTES = 30
     MAX_RATE = 0.001  # 0.1%
     PARTIAL_CLOSE_PERCENT = 50
@@ -61,132 +111,167 @@ class FundingConfig:
 # MOONSHOT DETECTION
 # =============================================================================
 
-class MoonshotDetectionConfig:
+@dataclass(frozen=True, slots=True)
+class _MoonshotDetectionConfig:
     # ==========================================================================
     # 3-TIER VELOCITY SYSTEM (90%+ CATCH RATE - Based on 183 moonshot analysis)
     # ==========================================================================
 
     # TIER 1 - INSTANT ENTRY (No confirmation needed, bypasses ALL checks)
-    TIER1_VELOCITY_5M = 2.5  # +2.5% in 5min = IMMEDIATE entry (catches 90.7%)
+    TIER1_VELOCITY_5M: float = 2.5  # +2.5% in 5min = IMMEDIATE entry (catches 90.7%)
 
     # TIER 2 - FAST ENTRY (Volume confirmation only)
-    TIER2_VELOCITY_5M = 1.5  # +1.5% in 5min with volume spike
-    TIER2_VOLUME_SPIKE = 1.3  # 1.3x average volume required
+    TIER2_VELOCITY_5M: float = 1.5  # +1.5% in 5min with volume spike
+    TIER2_VOLUME_SPIKE: float = 1.3  # 1.3x average volume required
 
     # TIER 3 - MICRO DETECTION (1-minute candle tracking)
-    TIER3_VELOCITY_1M = 1.5  # +1.5% in 1min (3 consecutive green candles)
-    TIER3_CONSECUTIVE_CANDLES = 3  # Number of green candles needed
+    TIER3_VELOCITY_1M: float = 1.5  # +1.5% in 1min (3 consecutive green candles)
+    TIER3_CONSECUTIVE_CANDLES: int = 3  # Number of green candles needed
 
     # MOMENTUM STACK (catches slow builders like PIPPINUSDT +91.6%)
-    MOMENTUM_1H_VELOCITY = 2.0  # +2% in 1 hour
-    MOMENTUM_15M_VELOCITY = 1.0  # +1% in 15 min
-    MOMENTUM_5M_VELOCITY = 0.5  # +0.5% in 5 min
+    MOMENTUM_1H_VELOCITY: float = 2.0  # +2% in 1 hour
+    MOMENTUM_15M_VELOCITY: float = 1.0  # +1% in 15 min
+    MOMENTUM_5M_VELOCITY: float = 0.5  # +0.5% in 5 min
 
     # ==========================================================================
     # PEAK HOUR OPTIMIZATION (53% of moonshots start 18:00-00:00 UTC)
     # ==========================================================================
-    PEAK_HOURS_UTC = [(18, 24), (0, 1)]  # 18:00-00:00 and 00:00-01:00 UTC
-    PEAK_HOUR_THRESHOLD_REDUCTION = 0.25  # Reduce thresholds by 25% during peak
+    PEAK_HOURS_UTC: Tuple[Tuple[int, int], ...] = ((18, 24), (0, 1))  # 18:00-00:00 and 00:00-01:00 UTC
+    PEAK_HOUR_THRESHOLD_REDUCTION: float = 0.25  # Reduce thresholds by 25% during peak
 
     # ==========================================================================
     # COOLDOWNS (Aggressive for faster re-entry)
     # ==========================================================================
-    ENTRY_COOLDOWN_TIER1 = 30   # 30 seconds for instant entries
-    ENTRY_COOLDOWN_TIER2 = 60   # 60 seconds for fast entries
-    ENTRY_COOLDOWN_TIER3 = 120  # 120 seconds for micro entries
-    ALERT_COOLDOWN = 15  # 15 seconds between alerts (was 60)
+    ENTRY_COOLDOWN_TIER1: int = 30   # 30 seconds for instant entries
+    ENTRY_COOLDOWN_TIER2: int = 60   # 60 seconds for fast entries
+    ENTRY_COOLDOWN_TIER3: int = 120  # 120 seconds for micro entries
+    ALERT_COOLDOWN: int = 15  # 15 seconds between alerts (was 60)
 
     # ==========================================================================
     # SCAN FREQUENCY (Faster detection)
     # ==========================================================================
-    SCAN_INTERVAL_ALL = 20      # 20 seconds for all 533 pairs
-    SCAN_INTERVAL_TOP100 = 5    # 5 seconds for top movers
+    SCAN_INTERVAL_ALL: int = 20      # 20 seconds for all 533 pairs
+    SCAN_INTERVAL_TOP100: int = 5    # 5 seconds for top movers
 
     # ==========================================================================
     # MOONDROP DETECTION (80%+ CAPTURE RATE - Based on 6,392 moondrop analysis)
     # ==========================================================================
 
     # TIER 1 - EXTREME MOONDROP (instant trigger)
-    MOONDROP_EXTREME_VELOCITY_1M = -2.0  # -2% in 1 min = instant SHORT
-    MOONDROP_EXTREME_VELOCITY_5M = -4.0  # -4% in 5 min = instant SHORT
+    MOONDROP_EXTREME_VELOCITY_1M: float = -2.0  # -2% in 1 min = instant SHORT
+    MOONDROP_EXTREME_VELOCITY_5M: float = -4.0  # -4% in 5 min = instant SHORT
 
     # TIER 2 - HIGH PRIORITY MOONDROP
-    MOONDROP_HIGH_VELOCITY_5M = -1.5  # -1.5% in 5 min
-    MOONDROP_HIGH_WICK_DROP = 3.0  # 3% wick drop
+    MOONDROP_HIGH_VELOCITY_5M: float = -1.5  # -1.5% in 5 min
+    MOONDROP_HIGH_WICK_DROP: float = 3.0  # 3% wick drop
 
     # TIER 3 - MEDIUM MOONDROP (80% capture)
-    MOONDROP_MEDIUM_VELOCITY_5M = -0.8  # -0.8% in 5 min (catches 80%+)
-    MOONDROP_MEDIUM_WICK_DROP = 2.0  # 2% wick drop (catches 97%)
-    MOONDROP_MEDIUM_BODY_DROP = 0.8  # 0.8% bearish body
-    MOONDROP_MEDIUM_RANGE_EXP = 1.3  # 1.3x range expansion
+    MOONDROP_MEDIUM_VELOCITY_5M: float = -0.8  # -0.8% in 5 min (catches 80%+)
+    MOONDROP_MEDIUM_WICK_DROP: float = 2.0  # 2% wick drop (catches 97%)
+    MOONDROP_MEDIUM_BODY_DROP: float = 0.8  # 0.8% bearish body
+    MOONDROP_MEDIUM_RANGE_EXP: float = 1.3  # 1.3x range expansion
 
     # TIER 4 - EARLY DETECTION (watchlist only)
-    MOONDROP_EARLY_WICK_DROP = 1.5  # 1.5% wick drop
-    MOONDROP_EARLY_VOL_SPIKE = 1.2  # 1.2x volume spike
+    MOONDROP_EARLY_WICK_DROP: float = 1.5  # 1.5% wick drop
+    MOONDROP_EARLY_VOL_SPIKE: float = 1.2  # 1.2x volume spike
 
     # ==========================================================================
     # LEGACY SIGNALS (Still used for Tier 2/3 confirmation)
     # ==========================================================================
-    MIN_SIGNALS_REQUIRED = 3  # Out of 6 (bypassed for Tier 1)
+    MIN_SIGNALS_REQUIRED: int = 3  # Out of 6 (bypassed for Tier 1)
 
     # Volume - LOWERED for 80% capture
-    VOLUME_SPIKE_5M = 1.3  # 1.3x average (was 2x) - p25 is 1.06x
-    VOLUME_SPIKE_1H = 2.0  # 2x average (was 3x)
+    VOLUME_SPIKE_5M: float = 1.3  # 1.3x average (was 2x) - p25 is 1.06x
+    VOLUME_SPIKE_1H: float = 2.0  # 2x average (was 3x)
 
     # Price velocity - LOWERED for 80% capture
-    PRICE_VELOCITY_5M_LONG = 0.8  # +0.8% (was 1.5%)
-    PRICE_VELOCITY_5M_SHORT = -0.8  # -0.8% (was -1.5%) - catches 80%+
-    PRICE_VELOCITY_1M = 0.3  # +0.3% (was 0.5%)
+    PRICE_VELOCITY_5M_LONG: float = 0.8  # +0.8% (was 1.5%)
+    PRICE_VELOCITY_5M_SHORT: float = -0.8  # -0.8% (was -1.5%) - catches 80%+
+    PRICE_VELOCITY_1M: float = 0.3  # +0.3% (was 0.5%)
 
     # NEW: Wick drop detection (catches 97% of moondrops at 2.0%)
-    WICK_DROP_THRESHOLD = 2.0  # 2% wick = moondrop signal
-    BODY_DROP_MIN = 0.5  # 0.5% bearish body
+    WICK_DROP_THRESHOLD: float = 2.0  # 2% wick = moondrop signal
+    BODY_DROP_MIN: float = 0.5  # 0.5% bearish body
 
     # NEW: Range expansion (catches 80% at 1.1x)
-    RANGE_EXPANSION_MIN = 1.1  # 1.1x average range = volatility spike
+    RANGE_EXPANSION_MIN: float = 1.1  # 1.1x average range = volatility spike
 
     # Open Interest
-    OI_SURGE_15M = 5.0  # +5%
-    OI_SURGE_1H = 10.0  # +10%
+    OI_SURGE_15M: float = 5.0  # +5%
+    OI_SURGE_1H: float = 10.0  # +10%
 
     # Funding
-    FUNDING_MAX_FOR_LONG = 0.003  # 0.3%
-    FUNDING_MIN_FOR_SHORT = 0.002  # 0.2%
+    FUNDING_MAX_FOR_LONG: float = 0.003  # 0.3%
+    FUNDING_MIN_FOR_SHORT: float = 0.002  # 0.2%
 
     # Breakout
-    ATR_MULTIPLIER = 1.5
+    ATR_MULTIPLIER: float = 1.5
 
     # Order Book
-    IMBALANCE_THRESHOLD = 0.65  # 65%
+    IMBALANCE_THRESHOLD: float = 0.65  # 65%
 
     # MEGA-SIGNAL OVERRIDE - LOWERED for 80% capture
-    MEGA_SIGNAL_VELOCITY = 2.0  # +2% in 5 min (was 3%)
-    MEGA_SIGNAL_MIN_SIGNALS = 1  # Only need 1/6 signals
+    MEGA_SIGNAL_VELOCITY: float = 2.0  # +2% in 5 min (was 3%)
+    MEGA_SIGNAL_MIN_SIGNALS: int = 1  # Only need 1/6 signals
+
+
+MoonshotDetectionConfig = _MoonshotDetectionConfig()
+
+# Hot-path thresholds re-exported as module globals for the velocity scanner
+TIER1_VELOCITY_5M: Final[float] = MoonshotDetectionConfig.TIER1_VELOCITY_5M
+TIER2_VELOCITY_5M: Final[float] = MoonshotDetectionConfig.TIER2_VELOCITY_5M
+TIER3_VELOCITY_1M: Final[float] = MoonshotDetectionConfig.TIER3_VELOCITY_1M
+PEAK_HOURS_UTC: Final[Tuple[Tuple[int, int], ...]] = MoonshotDetectionConfig.PEAK_HOURS_UTC
+PEAK_HOUR_THRESHOLD_REDUCTION: Final[float] = MoonshotDetectionConfig.PEAK_HOUR_THRESHOLD_REDUCTION
+ALERT_COOLDOWN: Final[int] = MoonshotDetectionConfig.ALERT_COOLDOWN
+PEAK_THRESHOLD_MULT: Final[float] = 1.0 - PEAK_HOUR_THRESHOLD_REDUCTION  # Applied to thresholds during peak hours
+
+# Tier 1/2/3 velocity thresholds, pre-scaled for both sessions
+TIER_THRESHOLDS_OFFPEAK: Final[Tuple[float, float, float]] = (
+    TIER1_VELOCITY_5M, TIER2_VELOCITY_5M, TIER3_VELOCITY_1M,
+)
+TIER_THRESHOLDS_PEAK: Final[Tuple[float, float, float]] = tuple(
+    t * PEAK_THRESHOLD_MULT for t in TIER_THRESHOLDS_OFFPEAK
+)
+
+
+def _hour_mask(ranges: Tuple[Tuple[int, int], ...]) -> int:
+    """24-bit mask with bit h set when UTC hour h falls inside one of the [start, end) ranges"""
+    mask = 0
+    for start, end in ranges:
+        for hour in range(start, end):
+            mask |= 1 << (hour % 24)
+    return mask
+
+
+PEAK_HOUR_MASK: Final[int] = _hour_mask(PEAK_HOURS_UTC)
 
 # =============================================================================
 # PAIR FILTERS
 # =============================================================================
 
-class PairFilterConfig:
-    QUOTE_ASSETS = ["USDT", "USDC"]
-    CONTRACT_TYPE = "PERPETUAL"
-    MIN_VOLUME_24H_USD = 100_000  # ULTRA-AGGRESSIVE: $100K to catch small caps before moon
-    MIN_LISTING_AGE_HOURS = 0  # Scan immediately on listing
-    MAX_SPREAD_PERCENT = 0.5  # Allow wider spreads for moonshots (was 0.15)
-    MIN_ORDERBOOK_DEPTH_USD = 50_000  # Lower depth requirement (was 200K)
-    MIN_LEVERAGE_AVAILABLE = 10
+@dataclass(frozen=True, slots=True)
+class _PairFilterConfig:
+    QUOTE_ASSETS: Tuple[str, ...] = tuple(sys.intern(q) for q in ("USDT", "USDC"))
+    CONTRACT_TYPE: str = "PERPETUAL"
+    MIN_VOLUME_24H_USD: int = 100_000  # ULTRA-AGGRESSIVE: $100K to catch small caps before moon
+    MIN_LISTING_AGE_HOURS: int = 0  # Scan immediately on listing
+    MAX_SPREAD_PERCENT: float = 0.5  # Allow wider spreads for moonshots (was 0.15)
+    MIN_ORDERBOOK_DEPTH_USD: int = 50_000  # Lower depth requirement (was 200K)
+    MIN_LEVERAGE_AVAILABLE: int = 10
+    TICKER_MAX_AGE: float = 60.0  # Bulk-refreshed tickers are reused for the whole filter pass
 
     # Exclusions
-    STABLECOINS = ["USDCUSDT", "TUSDUSDT", "DAIUSDT", "FDUSDUSDT"]
+    STABLECOINS: FrozenSet[str] = frozenset({"USDCUSDT", "TUSDUSDT", "DAIUSDT", "FDUSDUSDT"})
 
     # Scan intervals by tier (seconds) - AGGRESSIVE: faster scanning
-    TIER_1_INTERVAL = 2  # Hot pairs (was 3)
-    TIER_2_INTERVAL = 3  # Active pairs (was 5)
-    TIER_3_INTERVAL = 5  # Normal pairs (was 10)
-    TIER_4_INTERVAL = 10  # Low priority (was 30)
+    TIER_1_INTERVAL: int = 2  # Hot pairs (was 3)
+    TIER_2_INTERVAL: int = 3  # Active pairs (was 5)
+    TIER_3_INTERVAL: int = 5  # Normal pairs (was 10)
+    TIER_4_INTERVAL: int = 10  # Low priority (was 30)
 
     # TIER 1 HOT SYMBOLS - Memecoins, AI, and recent moonshots
-    TIER_1_SYMBOLS = [
+    TIER_1_SYMBOLS: FrozenSet[str] = frozenset({
         # Classic memecoins
         "DOGE", "SHIB", "PEPE", "BONK", "FLOKI", "WIF", "MEME", "BOME",
         # AI sector
@@ -194,14 +279,14 @@ class PairFilterConfig:
         # Recent top moonshots (last 5 days)
         "TAC", "PIPPIN", "RVV", "TRUST", "AIA", "MERL", "TANSSI", "TRADOOR",
         "PARTI", "RATS", "MON", "PARTIVERSE", "BANANAS31", "ARC", "BOB"
-    ]
+    })
 
     # ==========================================================================
     # ALLOWED COINS - ONLY trade valid Binance Futures perpetual contracts
     # Set to None to allow all coins, or a set of symbols to restrict
     # Updated: 2025-12-07 - Removed 27 invalid/delisted symbols
     # ==========================================================================
-    ALLOWED_COINS = {
+    ALLOWED_COINS: FrozenSet[str] = frozenset(map(sys.intern, {
         # VALID MOONSHOTS (verified active on Binance Futures)
         "USTCUSDT", "MOODENGUSDT", "LUNA2USDT",
         "SWARMSUSDT", "DOODUSDT", "BEATUSDT",
@@ -214,13 +299,18 @@ class PairFilterConfig:
         "PIPPINUSDT", "HUSDT", "SKATEUSDT",
         "PNUTUSDT", "PUFFERUSDT", "ZEREBROUSDT", "STABLEUSDT",
         "ARIAUSDT", "BIOUSDT", "WLDUSDT",
-    }
+    }))
+
+
+PairFilterConfig = _PairFilterConfig()
 
 # =============================================================================
 # MARKET REGIME
 # =============================================================================
 
 class MarketRegimeConfig:
+    __slots__ = ()
+
     REFERENCE_PAIRS = ["BTCUSDT", "ETHUSDT"]
     ADX_PERIOD = 14
     ADX_TRENDING_THRESHOLD = 25
@@ -229,37 +319,72 @@ class MarketRegimeConfig:
     ATR_EXTREME_MULTIPLIER = 3.0
     EVALUATION_INTERVAL_MINUTES = 5
 
+# =============================================================================
+# RUNTIME SETTINGS (parsed once from the environment snapshot)
+# =============================================================================
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    redis_url: str
+    binance_api_key: str
+    binance_api_secret: str
+    binance_testnet: bool
+    port: int
+    event_loop: str
+    log_level: str
+    timezone: str
+
+    @classmethod
+    def load(cls) -> "Settings":
+        """Parse process settings from the environment snapshot"""
+        return cls(
+            redis_url=_env("REDIS_URL", "redis://localhost:6379"),
+            binance_api_key=_env("BINANCE_API_KEY", ""),
+            binance_api_secret=_env("BINANCE_API_SECRET", ""),
+            binance_testnet=_env("BINANCE_TESTNET", "false").lower() == "true",
+            port=_envi("PORT", "8050"),
+            event_loop=_env("EVENT_LOOP", "uvloop").lower(),
+            log_level=_env("LOG_LEVEL", "INFO"),
+            timezone=_env("BOT_TIMEZONE", "UTC"),
+        )
+
+
+SETTINGS: Final[Settings] = Settings.load()
+
 # =============================================================================
 # REDIS
 # =============================================================================
 
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_URL = SETTINGS.redis_url
 REDIS_PREFIX = "msb:"  # moonshot-bot prefix
 
 # =============================================================================
 # BINANCE
 # =============================================================================
 
-BINANCE_API_KEY = os.getenv("BINANCE_API_KEY", "")
-BINANCE_API_SECRET = os.getenv("BINANCE_API_SECRET", "")
-BINANCE_TESTNET = os.getenv("BINANCE_TESTNET", "false").lower() == "true"
+BINANCE_API_KEY = SETTINGS.binance_api_key
+BINANCE_API_SECRET = SETTINGS.binance_api_secret
+BINANCE_TESTNET = SETTINGS.binance_testnet
 
 # =============================================================================
 # LOGGING
 # =============================================================================
 
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-BOT_TIMEZONE = os.getenv("BOT_TIMEZONE", "UTC")
+LOG_LEVEL = SETTINGS.log_level
+BOT_TIMEZONE = SETTINGS.timezone
 
 # =============================================================================
 # SERVER
 # =============================================================================
 
-PORT = int(os.getenv("PORT", "8050"))
+PORT = SETTINGS.port
+EVENT_LOOP = SETTINGS.event_loop  # "uvloop" or "asyncio" (uvicorn loop implementation)
 
 # =============================================================================
 # TIME LIMITS
 # =============================================================================
 
 class TimeLimitsConfig:
+    __slots__ = ()
+
     MAX_HOLD_HOURS = 168  # 7 days maximum
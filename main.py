@@ -11,30 +11,39 @@ Strategy:
 - NO INDIVIDUAL SL/TP - positions only close when macro direction flips
 """
 import asyncio
+import random
 import sys
 import os
+import time
 
 # Fix Windows console encoding for emoji support
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
     sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 from datetime import datetime
+from typing import List, Optional, Tuple
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 import uvicorn
+import numpy as np
 
-from config import PORT, LOG_LEVEL, PairFilterConfig
+from config import PORT, EVENT_LOOP, LOG_LEVEL, PairFilterConfig
 from src import DataFeed, PairFilter, PositionTracker, OrderExecutor
-from src.macro_strategy import MacroIndicator, MacroConfig, MacroExitManager, MacroDirection
+from src.macro_strategy import MacroIndicator, MacroConfig, MacroExitManager, MacroDirection, compute_pnl
 from src.profit_tracker import profit_tracker
 
 # Configure logging
+# Sinks are enqueued: formatting and writes happen on loguru's worker thread, not the event loop
 logger.remove()
 logger.add(
     sys.stdout,
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan> - <level>{message}</level>",
-    level=LOG_LEVEL
+    level=LOG_LEVEL,
+    enqueue=True,
+    backtrace=False,
+    diagnose=False
 )
 
 # Also log to file
@@ -42,7 +51,10 @@ logger.add(
     "logs/macro_bot_{time:YYYY-MM-DD}.log",
     rotation="1 day",
     retention="7 days",
-    level="DEBUG"
+    level="DEBUG",
+    enqueue=True,
+    backtrace=False,
+    diagnose=False
 )
 
 
@@ -65,13 +77,16 @@ class MacroIndexBot:
         self.exit_manager = MacroExitManager(self.config)
 
         self._running = False
-        self._macro_task = None
-        self._monitor_task = None
+        self._tasks: List[asyncio.Task] = []
 
         # Trading state
         self.current_direction: MacroDirection = MacroDirection.FLAT
         self.whitelisted_symbols: list = []
 
+        # Last get_status() result and the state it was built from
+        self._status_key: Optional[tuple] = None
+        self._status: dict = {}
+
     async def close_all_positions(self):
         """Close all open positions before starting fresh"""
         logger.info("=" * 60)
@@ -88,27 +103,19 @@ class MacroIndexBot:
 
             logger.info(f"Found {len(open_positions)} positions to close")
 
-            for pos in open_positions:
+            # reduceOnly market closes go out in batchOrders chunks of 5
+            results = await self.order_executor.close_positions_batch(open_positions)
+
+            for pos, result in zip(open_positions, results):
                 symbol = pos['symbol']
-                amt = float(pos['positionAmt'])
-                side = 'LONG' if amt > 0 else 'SHORT'
+                side = 'LONG' if float(pos['positionAmt']) > 0 else 'SHORT'
                 pnl = float(pos['unRealizedProfit'])
 
-                try:
-                    if amt > 0:
-                        result = await self.order_executor.close_long(symbol)
-                    else:
-                        result = await self.order_executor.close_short(symbol)
-
-                    status = "+" if pnl > 0 else ""
-                    if result.success:
-                        logger.info(f"  Closed {side} {symbol} | PnL: ${status}{pnl:.2f}")
-                    else:
-                        logger.error(f"  FAILED {symbol}: {result.error}")
-                except Exception as e:
-                    logger.error(f"  ERROR {symbol}: {e}")
-
-                await asyncio.sleep(0.1)
+                status = "+" if pnl > 0 else ""
+                if result.success:
+                    logger.info("  Closed {} {} | PnL: ${}{:.2f}", side, symbol, status, pnl)
+                else:
+                    logger.error("  FAILED {}: {}", symbol, result.error)
 
             logger.info("All positions closed!")
 
@@ -132,7 +139,7 @@ class MacroIndexBot:
 
         # Get whitelisted symbols from config
         if hasattr(PairFilterConfig, 'ALLOWED_COINS') and PairFilterConfig.ALLOWED_COINS:
-            self.whitelisted_symbols = list(PairFilterConfig.ALLOWED_COINS)
+            self.whitelisted_symbols = sorted(PairFilterConfig.ALLOWED_COINS)
             logger.info(f"Using {len(self.whitelisted_symbols)} whitelisted coins")
         else:
             # Fallback to pair filter
@@ -140,12 +147,14 @@ class MacroIndexBot:
             self.whitelisted_symbols = list(self.pair_filter.pairs.keys())
             logger.info(f"Loaded {len(self.whitelisted_symbols)} trading pairs")
 
-        # Initialize position tracker
-        await self.position_tracker.initialize()
+        # Position tracker (Redis + exchange sync), symbol precisions and starting balance are independent - fetch together
+        _, _, balance = await asyncio.gather(
+            self.position_tracker.initialize(),
+            self.order_executor.initialize(),
+            self.data_feed.get_account_balance()
+        )
         logger.info("Position tracker ready")
 
-        # Get starting balance
-        balance = await self.data_feed.get_account_balance()
         profit_tracker.set_start_balance(balance)
         logger.info(f"Starting balance: ${balance:.2f}")
 
@@ -171,25 +180,43 @@ class MacroIndexBot:
         logger.info("Ticker stream started - SL monitoring active")
 
         # Start macro calculation and monitor loops
-        self._macro_task = asyncio.create_task(self._macro_loop())
-        self._monitor_task = asyncio.create_task(self._monitor_loop())
+        self._tasks = [
+            asyncio.create_task(self._macro_loop(), name="macro_loop"),
+            asyncio.create_task(self._monitor_loop(), name="monitor_loop"),
+        ]
 
     async def stop(self):
         """Stop the bot"""
         self._running = False
         logger.info("Stopping bot...")
 
-        if self._macro_task:
-            self._macro_task.cancel()
-        if self._monitor_task:
-            self._monitor_task.cancel()
+        # Cancel every loop in one pass, then reap them together
+        for task in self._tasks:
+            task.cancel()
+        try:
+            async with asyncio.timeout(self.config.SHUTDOWN_TIMEOUT):
+                results = await asyncio.gather(*self._tasks, return_exceptions=True)
+            for task, result in zip(self._tasks, results):
+                if isinstance(result, Exception):
+                    logger.error(f"{task.get_name()} exited with error: {result}")
+        except TimeoutError:
+            logger.warning(f"Background loops did not stop within {self.config.SHUTDOWN_TIMEOUT}s")
+        self._tasks = []
 
         # Print final report
         profit_tracker.print_report()
 
+        # Stop the ticker stream before its client goes away, then release the HTTP pool
+        await self.data_feed.stop_streams()
+        await self.data_feed.close()
+
+        # Drain queued log messages before the process exits
+        await logger.complete()
+
     async def _macro_loop(self):
         """Main loop - calculate macro indicator and trade"""
         logger.info("Macro calculation loop started (24H timeframe)")
+        failures = 0
 
         while self._running:
             try:
@@ -211,15 +238,21 @@ class MacroIndexBot:
                     if score.direction != MacroDirection.FLAT:
                         await self._ensure_positions_open(score.direction.value)
 
+                failures = 0
                 await asyncio.sleep(self.config.SCAN_INTERVAL)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Macro loop error: {e}")
-                import traceback
-                logger.error(traceback.format_exc())
-                await asyncio.sleep(5)
+                failures += 1
+                # loguru renders the traceback only in sinks that emit the record
+                logger.opt(exception=True).error(f"Macro loop error: {e}")
+                await asyncio.sleep(self._error_backoff(failures))
+
+    def _error_backoff(self, failures: int) -> float:
+        """Exponential backoff with jitter for consecutive loop errors"""
+        delay = min(self.config.ERROR_BACKOFF_BASE * 2 ** (failures - 1), self.config.ERROR_BACKOFF_MAX)
+        return delay + random.random()
 
     async def _handle_direction_change(self, score):
         """Handle when macro direction changes - NO LONGER CLOSES POSITIONS"""
@@ -244,41 +277,38 @@ class MacroIndexBot:
         """Close all positions for a given direction"""
         logger.info(f"Closing all {direction} positions...")
 
-        positions = self.position_tracker.get_all_positions()
+        positions = self.position_tracker.get_positions_by_direction(direction)
         closed = 0
 
-        for position in positions:
-            if position.direction == direction:
-                symbol = position.symbol
-                try:
-                    if direction == "LONG":
-                        result = await self.order_executor.close_long(symbol)
-                    else:
-                        result = await self.order_executor.close_short(symbol)
-
-                    if result.success:
-                        closed += 1
-                        # Calculate PnL
-                        current_price = self.data_feed.get_current_price(symbol) or position.entry_price
-                        if direction == "LONG":
-                            pnl_pct = ((current_price - position.entry_price) / position.entry_price) * 100
-                        else:
-                            pnl_pct = ((position.entry_price - current_price) / position.entry_price) * 100
-
-                        pnl_usd = position.margin * (pnl_pct / 100) * self.config.LEVERAGE
-                        profit_tracker.record_exit(
-                            symbol=symbol,
-                            exit_price=current_price,
-                            exit_reason="macro_flip",
-                            pnl_percent=pnl_pct * self.config.LEVERAGE,
-                            pnl_usd=pnl_usd,
-                            peak_profit=0
-                        )
-
-                except Exception as e:
-                    logger.error(f"Error closing {symbol}: {e}")
-
-                await asyncio.sleep(0.05)  # Small delay between closes
+        # Closes run concurrently, bounded by the executor's order semaphore
+        results = await self.order_executor.close_positions([p.symbol for p in positions])
+
+        for position, result in zip(positions, results):
+            symbol = position.symbol
+            try:
+                if result.success:
+                    closed += 1
+                    # Calculate PnL
+                    current_price = self.data_feed.get_current_price(symbol) or position.entry_price
+                    pnl_pct, pnl_usd = compute_pnl(
+                        direction, position.entry_price, current_price, position.margin, self.config.LEVERAGE
+                    )
+                    profit_tracker.record_exit(
+                        symbol=symbol,
+                        exit_price=current_price,
+                        exit_reason="macro_flip",
+                        pnl_percent=pnl_pct,
+                        pnl_usd=pnl_usd,
+                        peak_profit=0,
+                        save=False
+                    )
+
+            except Exception as e:
+                logger.error(f"Error closing {symbol}: {e}")
+
+        # One tracker file write for the whole sweep
+        if closed:
+            profit_tracker.save()
 
         logger.info(f"Closed {closed} {direction} positions")
 
@@ -296,41 +326,33 @@ class MacroIndexBot:
         opened = 0
         failed = 0
 
-        for symbol in self.whitelisted_symbols:
-            try:
-                # Open position (SL handled by software monitoring in check_exit)
-                if direction == "LONG":
-                    result = await self.order_executor.open_long(
-                        symbol=symbol,
-                        margin=margin_per_position,
-                        leverage=self.config.LEVERAGE
-                    )
-                else:  # SHORT
-                    result = await self.order_executor.open_short(
-                        symbol=symbol,
-                        margin=margin_per_position,
-                        leverage=self.config.LEVERAGE
-                    )
+        # Orders go out through batchOrders (SL handled by software monitoring in check_exit)
+        results = await self.order_executor.open_positions_batch(
+            symbols=self.whitelisted_symbols,
+            direction=direction,
+            margin=margin_per_position,
+            leverage=self.config.LEVERAGE
+        )
 
-                if result.success:
-                    opened += 1
-                    profit_tracker.record_entry(
-                        symbol=symbol,
-                        direction=direction,
-                        entry_price=result.entry_price,
-                        leverage=self.config.LEVERAGE,
-                        margin=margin_per_position,
-                        velocity=0
-                    )
-                else:
-                    failed += 1
-                    logger.debug(f"Failed to open {symbol}: {result.error}")
-
-            except Exception as e:
+        for result in results:
+            if result.success:
+                opened += 1
+                profit_tracker.record_entry(
+                    symbol=result.symbol,
+                    direction=direction,
+                    entry_price=result.entry_price,
+                    leverage=self.config.LEVERAGE,
+                    margin=margin_per_position,
+                    velocity=0,
+                    save=False
+                )
+            else:
                 failed += 1
-                logger.debug(f"Error opening {symbol}: {e}")
+                logger.debug("Failed to open {}: {}", result.symbol, result.error)
 
-            await asyncio.sleep(0.05)  # Small delay between orders
+        # One tracker file write for the whole batch
+        if opened:
+            profit_tracker.save()
 
         logger.info(f"Opened {opened}/{len(self.whitelisted_symbols)} {direction} positions (failed: {failed})")
 
@@ -362,121 +384,148 @@ class MacroIndexBot:
     async def _monitor_loop(self):
         """Monitor open positions - Check SL and Trailing Stop"""
         logger.info(f"Position monitor loop started (SL: {self.config.STOP_LOSS_PERCENT}%, Trailing: {self.config.TRAILING_DISTANCE_PERCENT}% @ {self.config.TRAILING_ACTIVATION_PERCENT}%)")
+        last_save = 0.0
+        # Position set and its static columns, rebuilt only when the tracker's version changes
+        snap_version = -1
+        snapshot = ()
+        snap_signs = snap_entries = None
+        get_price = self.data_feed.get_current_price
+        failures = 0
 
         while self._running:
             try:
-                positions = self.position_tracker.get_all_positions()
-
-                if not positions:
-                    await asyncio.sleep(5)
+                if self.position_tracker.get_position_count() == 0:
+                    # Idle until a position is tracked (timeout is just a watchdog)
+                    await self.position_tracker.wait_for_positions(self.config.MONITOR_IDLE_WAIT)
                     continue
 
-                # Check each position for SL/Trailing exit
-                for position in positions:
-                    symbol = position.symbol
-                    current_price = self.data_feed.get_current_price(symbol)
-
-                    if not current_price or position.entry_price <= 0:
-                        continue
-
-                    # Calculate current PnL %
-                    if position.direction == "LONG":
-                        current_pnl_pct = ((current_price - position.entry_price) / position.entry_price) * 100
-                    else:  # SHORT
-                        current_pnl_pct = ((position.entry_price - current_price) / position.entry_price) * 100
+                if self.position_tracker.version != snap_version:
+                    snap_version = self.position_tracker.version
+                    snapshot = tuple(p for p in self.position_tracker.get_all_positions() if p.entry_price > 0)
+                    n = len(snapshot)
+                    snap_signs = np.fromiter((1.0 if p.direction == "LONG" else -1.0 for p in snapshot), dtype=np.float64, count=n)
+                    snap_entries = np.fromiter((p.entry_price for p in snapshot), dtype=np.float64, count=n)
+
+                # Gather positions with a live price
+                all_prices = np.fromiter((get_price(p.symbol) or 0.0 for p in snapshot), dtype=np.float64, count=len(snapshot))
+                live_idx = np.flatnonzero(all_prices > 0)
+
+                if live_idx.size:
+                    live = [snapshot[i] for i in live_idx]
+                    signs = snap_signs[live_idx]
+                    entry_prices = snap_entries[live_idx]
+                    current_prices = all_prices[live_idx]
+                    prices = current_prices.tolist()
+                    peak_profits = np.fromiter((p.peak_profit_pct for p in live), dtype=np.float64, count=len(live))
+
+                    # Check SL and Trailing for every position in one pass
+                    pnl_pct, peaks, exits = self.exit_manager.check_exits(
+                        signs, entry_prices, current_prices, peak_profits
+                    )
 
-                    # Update peak profit if current is higher
-                    if current_pnl_pct > position.peak_profit_pct:
-                        position.peak_profit_pct = current_pnl_pct
+                    # Update peak profit where current is higher
+                    for i in np.flatnonzero(peaks > peak_profits):
+                        position = live[i]
+                        position.peak_profit_pct = float(peaks[i])
+                        self.position_tracker.mark_dirty()
                         # Log when trailing activates
-                        if current_pnl_pct >= self.config.TRAILING_ACTIVATION_PERCENT:
-                            logger.info(f"TRAILING ACTIVE: {symbol} peak={current_pnl_pct:.1f}% (exit at {current_pnl_pct - self.config.TRAILING_DISTANCE_PERCENT:.1f}%)")
-
-                    # Check if SL or Trailing should trigger
-                    exit_action = self.exit_manager.check_exit(
-                        direction=position.direction,
-                        entry_price=position.entry_price,
-                        current_price=current_price,
-                        peak_profit_pct=position.peak_profit_pct
-                    )
+                        if pnl_pct[i] >= self.config.TRAILING_ACTIVATION_PERCENT:
+                            logger.info("TRAILING ACTIVE: {} peak={:.1f}% (exit at {:.1f}%)", position.symbol, pnl_pct[i], pnl_pct[i] - self.config.TRAILING_DISTANCE_PERCENT)
 
-                    if exit_action and exit_action.get('action') == 'close':
-                        await self._execute_exit(symbol, position, exit_action, current_price)
-                        await asyncio.sleep(0.1)  # Small delay between exits
+                    if exits:
+                        await self._execute_exits([(live[i], exit_action, prices[i]) for i, exit_action in exits])
 
-                # Save updated peak profits to Redis periodically
-                await self.position_tracker._save_to_redis()
-                await asyncio.sleep(5)  # Check every 5 seconds
+                # Save updated peak profits to Redis periodically (one SET, skipped if nothing moved)
+                now = time.time()
+                if now - last_save >= self.config.POSITION_SAVE_INTERVAL:
+                    await self.position_tracker.flush()
+                    last_save = now
+
+                # Re-check as soon as the stream delivers new prices (watchdog if it stalls)
+                failures = 0
+                await self.data_feed.wait_for_tickers(self.config.MONITOR_MAX_WAIT)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Monitor loop error: {e}")
-                await asyncio.sleep(5)
-
-    async def _execute_exit(self, symbol: str, position, exit_action: dict, current_price: float):
-        """Execute an exit trade"""
-        try:
-            direction = position.direction
-            entry_price = position.entry_price
-
-            # Calculate PnL
-            if direction == "LONG":
-                pnl_pct = ((current_price - entry_price) / entry_price) * 100 * self.config.LEVERAGE
-            else:
-                pnl_pct = ((entry_price - current_price) / entry_price) * 100 * self.config.LEVERAGE
-
-            pnl_usd = position.margin * (pnl_pct / 100)
+                failures += 1
+                logger.opt(exception=True).error(f"Monitor loop error: {e}")
+                await asyncio.sleep(self._error_backoff(failures))
+
+    async def _execute_exits(self, exits: List[Tuple[object, dict, float]]):
+        """Execute exit trades for (position, exit_action, current_price) entries"""
+        # Closes run concurrently; tracker/Redis writes are batched after all of them
+        results = await self.order_executor.close_positions([position.symbol for position, _, _ in exits])
+
+        recorded = False
+        for (position, exit_action, current_price), result in zip(exits, results):
+            symbol = position.symbol
+            try:
+                if result.success:
+                    # Calculate PnL
+                    pnl_pct, pnl_usd = compute_pnl(
+                        position.direction, position.entry_price, current_price, position.margin, self.config.LEVERAGE
+                    )
 
-            # Close position
-            if direction == "LONG":
-                result = await self.order_executor.close_long(symbol)
-            else:
-                result = await self.order_executor.close_short(symbol)
+                    # Record in profit tracker
+                    profit_tracker.record_exit(
+                        symbol=symbol,
+                        exit_price=current_price,
+                        exit_reason=exit_action['reason'],
+                        pnl_percent=pnl_pct,
+                        pnl_usd=pnl_usd,
+                        peak_profit=0,
+                        save=False
+                    )
+                    recorded = True
 
-            if result.success:
-                # Record in profit tracker
-                profit_tracker.record_exit(
-                    symbol=symbol,
-                    exit_price=current_price,
-                    exit_reason=exit_action['reason'],
-                    pnl_percent=pnl_pct,
-                    pnl_usd=pnl_usd,
-                    peak_profit=0
-                )
+                    status = "+" if pnl_usd > 0 else ""
+                    logger.info("{}: {} | PnL: ${}{:.2f} ({:+.2f}%)", exit_action['reason'].upper(), symbol, status, pnl_usd, pnl_pct)
 
-                status = "+" if pnl_usd > 0 else ""
-                reason = exit_action['reason'].upper()
-                logger.info(f"{reason}: {symbol} | PnL: ${status}{pnl_usd:.2f} ({pnl_pct:+.2f}%)")
+                    # Remove from tracker after successful exit
+                    await self.position_tracker.remove_position(symbol, save=False)
+                else:
+                    logger.error("Exit failed: {} - {}", symbol, result.error)
+                    # If position doesn't exist on Binance, remove from tracker to stop retry loop
+                    if "No position found" in str(result.error) or "position" in str(result.error).lower():
+                        logger.warning("Removing stale position from tracker: {}", symbol)
+                        await self.position_tracker.remove_position(symbol, save=False)
 
-                # Remove from tracker after successful exit
-                await self.position_tracker.remove_position(symbol)
-            else:
-                logger.error(f"Exit failed: {symbol} - {result.error}")
-                # If position doesn't exist on Binance, remove from tracker to stop retry loop
-                if "No position found" in str(result.error) or "position" in str(result.error).lower():
-                    logger.warning(f"Removing stale position from tracker: {symbol}")
-                    await self.position_tracker.remove_position(symbol)
+            except Exception as e:
+                logger.error(f"Error executing exit for {symbol}: {e}")
 
-        except Exception as e:
-            logger.error(f"Error executing exit: {e}")
+        # One tracker file write and one Redis SET for the whole batch
+        if recorded:
+            profit_tracker.save()
+        await self.position_tracker.flush()
 
     def get_status(self):
-        """Get bot status"""
-        positions = self.position_tracker.get_all_positions()
-        metrics = profit_tracker.get_metrics()
+        """Get bot status (rebuilt only when an input changed)"""
+        # The profit tracker's version changes whenever trades or start balance change
+        key = (
+            self._running,
+            self.current_direction,
+            self.position_tracker.version,
+            len(self.whitelisted_symbols),
+            profit_tracker.version
+        )
+        if key == self._status_key:
+            return self._status
 
-        return {
+        metrics = profit_tracker.get_metrics()
+        self._status_key = key
+        self._status = {
             "running": self._running,
             "strategy": "macro_index",
             "direction": self.current_direction.value,
-            "positions": len(positions),
+            "positions": self.position_tracker.get_position_count(),
             "coins": len(self.whitelisted_symbols),
             "total_trades": metrics.total_trades,
             "win_rate": f"{metrics.win_rate:.1f}%",
             "total_pnl": f"${metrics.total_pnl_usd:+.2f}",
             "start_balance": f"${profit_tracker.start_balance:.2f}"
         }
+        return self._status
 
 
 # FastAPI app
@@ -508,7 +557,7 @@ async def lifespan(app: FastAPI):
     await bot.stop()
 
 
-app = FastAPI(lifespan=lifespan, title="Macro Index Bot")
+app = FastAPI(lifespan=lifespan, title="Macro Index Bot", default_response_class=ORJSONResponse)
 
 
 @app.get("/")
@@ -532,13 +581,14 @@ async def metrics():
 
 @app.get("/report")
 async def report():
-    return {"report": profit_tracker.print_report()}
+    return {"report": profit_tracker.get_report()}
 
 
 @app.get("/positions")
 async def positions():
     if bot:
-        return {"positions": [str(p) for p in bot.position_tracker.get_all_positions()]}
+        # Pre-encoded body - no serialization on the request path
+        return Response(content=bot.position_tracker.get_positions_json(), media_type="application/json")
     return {"positions": []}
 
 
@@ -571,4 +621,13 @@ if __name__ == "__main__":
     logger.info(f"Time: {datetime.now().isoformat()}")
     logger.info("=" * 60)
 
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
+    # EVENT_LOOP=asyncio opts out; uvloop isn't built for Windows, so fall back there too
+    loop_impl = EVENT_LOOP
+    if loop_impl == "uvloop":
+        try:
+            import uvloop  # noqa: F401
+        except ImportError:
+            loop_impl = "asyncio"
+            logger.warning("uvloop not installed - using the default asyncio event loop")
+
+    uvicorn.run(app, host="0.0.0.0", port=PORT, loop=loop_impl, http="httptools")
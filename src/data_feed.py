@@ -3,19 +3,42 @@ Data Feed Module
 Handles real-time data from Binance Futures via WebSocket and REST API
 """
 import asyncio
+import sys
+import aiohttp
 from typing import Dict, List, Callable, Optional
 from binance import AsyncClient, BinanceSocketManager
+import orjson
+from asyncio_throttle import Throttler
 from binance.enums import *
 from loguru import logger
 import time
 from dataclasses import dataclass, field
 from collections import defaultdict
 
-from config import BINANCE_API_KEY, BINANCE_API_SECRET, BINANCE_TESTNET
+from config import BINANCE_API_KEY, BINANCE_API_SECRET, BINANCE_TESTNET, PairFilterConfig
 from src.velocity_scanner import VelocityScanner, VelocityAlert
 
+# Keep-alive pool shared by every REST call so orders don't pay a TLS/DNS handshake each
+HTTP_POOL_SIZE = 50
+HTTP_KEEPALIVE_TIMEOUT = 75
+HTTP_DNS_CACHE_TTL = 300
+# Binance USD-M allows 2400 request weight / minute per IP; keep headroom for order traffic
+REST_WEIGHT_LIMIT = 2000
+REST_WEIGHT_PERIOD = 60.0
+# All-market ticker snapshots younger than this are shared instead of re-fetched
+ALL_TICKERS_TTL = 1.0
+
+
+def _decode_ws_message(evt):
+    """orjson replacement for ReconnectingWebsocket._handle_message (futures streams are text frames)"""
+    try:
+        return orjson.loads(evt)
+    except orjson.JSONDecodeError:
+        logger.debug("Error parsing websocket message")
+        return None
+
 
-@dataclass
+@dataclass(slots=True)
 class TickerData:
     symbol: str
     price: float
@@ -26,7 +49,7 @@ class TickerData:
     timestamp: float = field(default_factory=time.time)
 
 
-@dataclass
+@dataclass(slots=True)
 class KlineData:
     symbol: str
     interval: str
@@ -38,7 +61,7 @@ class KlineData:
     timestamp: float
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderBookData:
     symbol: str
     bids: List[List[float]]  # [[price, quantity], ...]
@@ -46,7 +69,7 @@ class OrderBookData:
     timestamp: float = field(default_factory=time.time)
 
 
-@dataclass
+@dataclass(slots=True)
 class FundingRateData:
     symbol: str
     funding_rate: float
@@ -62,6 +85,12 @@ class DataFeed:
     def __init__(self):
         self.client: Optional[AsyncClient] = None
         self.bsm: Optional[BinanceSocketManager] = None
+        # Sliding-window budget of request weight for the market-data REST helpers below
+        self._rest_throttle = Throttler(REST_WEIGHT_LIMIT, REST_WEIGHT_PERIOD)
+        # Last futures_ticker() response, shared by every caller within ALL_TICKERS_TTL
+        self._all_tickers: List[dict] = []
+        self._all_tickers_at = 0.0
+        self._all_tickers_lock = asyncio.Lock()
 
         # Data storage
         self.tickers: Dict[str, TickerData] = {}
@@ -87,6 +116,8 @@ class DataFeed:
         self._ticker_stream_task = None
         self._ticker_stream_active = False
         self._ticker_update_count = 0
+        # Set after every ticker batch so consumers can wake on fresh prices
+        self.ticker_event = asyncio.Event()
 
         # Velocity scanner for real-time moonshot detection
         self.velocity_scanner = VelocityScanner()
@@ -97,19 +128,19 @@ class DataFeed:
         """Initialize Binance client"""
         logger.info("Initializing Binance client...")
         
-        if BINANCE_TESTNET:
-            self.client = await AsyncClient.create(
-                BINANCE_API_KEY,
-                BINANCE_API_SECRET,
-                testnet=True
-            )
-            logger.info("Connected to Binance TESTNET")
-        else:
-            self.client = await AsyncClient.create(
-                BINANCE_API_KEY,
-                BINANCE_API_SECRET
-            )
-            logger.info("Connected to Binance PRODUCTION")
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_SIZE,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL
+        )
+        # The client's session owns the connector and closes it in close_connection()
+        self.client = await AsyncClient.create(
+            BINANCE_API_KEY,
+            BINANCE_API_SECRET,
+            testnet=BINANCE_TESTNET,
+            session_params={'connector': connector}
+        )
+        logger.info(f"Connected to Binance {'TESTNET' if BINANCE_TESTNET else 'PRODUCTION'}")
         
         self.bsm = BinanceSocketManager(self.client)
     
@@ -132,7 +163,7 @@ class DataFeed:
     # ==================== WebSocket Stream Methods ====================
 
     async def start_ticker_stream(self):
-        """Start the all-market ticker stream for futures"""
+        """Start the all-market mini ticker stream for futures"""
         self._stream_running = True
         self._ticker_stream_task = asyncio.create_task(self._run_ticker_stream())
         logger.info("🔌 Ticker stream task started")
@@ -145,7 +176,13 @@ class DataFeed:
         while self._stream_running:
             try:
                 logger.info("🔌 Connecting to futures ticker stream...")
-                ts = self.bsm.futures_multiplex_socket(['!ticker@arr'])
+                # Mini tickers carry everything the cache needs in a much smaller payload
+                ts = self.bsm.futures_multiplex_socket(['!miniTicker@arr'])
+                # Decode the ~1s all-market payload with orjson instead of stdlib json.
+                # Overrides a private ReconnectingWebsocket method whose name/signature
+                # (_handle_message(evt) -> dict|None) matches the python-binance==1.0.19 pin
+                # in requirements.txt; re-check this line when bumping that dependency.
+                ts._handle_message = _decode_ws_message
 
                 async with ts as stream:
                     self._ticker_stream_active = True
@@ -175,40 +212,63 @@ class DataFeed:
 
     def _process_ticker_update(self, data):
         """Process incoming ticker data from WebSocket"""
-        if isinstance(data, list):
-            for ticker in data:
-                self._update_single_ticker(ticker)
-        else:
-            self._update_single_ticker(data)
-
-    def _update_single_ticker(self, ticker):
-        """Update a single ticker in cache from WebSocket data"""
-        symbol = ticker.get('s')
-        if not symbol:
-            return
-
-        price = float(ticker.get('c', 0))
-
-        self.tickers[symbol] = TickerData(
-            symbol=symbol,
-            price=price,
-            price_change_percent_24h=float(ticker.get('P', 0)),
-            volume_24h=float(ticker.get('q', 0)),
-            high_24h=float(ticker.get('h', 0)),
-            low_24h=float(ticker.get('l', 0))
-        )
-        self._ticker_update_count += 1
-
-        # Feed to velocity scanner for real-time detection
-        if price > 0:
-            alert = self.velocity_scanner.on_ticker_update(symbol, price)
-            if alert:
-                # Store alert for processing
-                self.velocity_alerts.append(alert)
+        if not isinstance(data, list):
+            data = [data]
+
+        updates = []
+        # Hoisted once per message: this loop runs for every symbol on every stream push
+        tickers = self.tickers
+        append = updates.append
+        make_ticker = TickerData
+        now = time.time()
+        count = 0
+
+        for ticker in data:
+            symbol = ticker.get('s')
+            if not symbol:
+                continue
+            count += 1
+
+            price = float(ticker.get('c', 0))
+            # Mini tickers have no 'P'; derive the 24h change from the rolling open
+            open_price = float(ticker.get('o', 0))
+            change_pct = (price - open_price) / open_price * 100 if open_price > 0 else 0.0
+
+            tickers[symbol] = make_ticker(
+                symbol,
+                price,
+                change_pct,
+                float(ticker.get('q', 0)),
+                float(ticker.get('h', 0)),
+                float(ticker.get('l', 0)),
+                now
+            )
+            if price > 0:
+                append((symbol, price))
+
+        self._ticker_update_count += count
+
+        # Feed the whole message to the velocity scanner in one pass
+        if updates:
+            alerts = self.velocity_scanner.on_ticker_batch(updates)
+            if alerts:
+                # Store alerts for processing
+                self.velocity_alerts.extend(alerts)
                 # Keep only last 100 alerts
                 if len(self.velocity_alerts) > 100:
                     self.velocity_alerts = self.velocity_alerts[-100:]
 
+        self.ticker_event.set()
+
+    async def wait_for_tickers(self, timeout: float) -> bool:
+        """Wait for the next ticker batch; returns False if none arrived within timeout"""
+        self.ticker_event.clear()
+        try:
+            await asyncio.wait_for(self.ticker_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
     async def stop_streams(self):
         """Stop all WebSocket streams"""
         logger.info("Stopping WebSocket streams...")
@@ -224,35 +284,76 @@ class DataFeed:
 
     # ==================== End WebSocket Stream Methods ====================
     
+    async def _use_weight(self, weight: int):
+        """Wait until the REST weight budget has room for a request of this weight"""
+        for _ in range(weight):
+            await self._rest_throttle.acquire()
+
     async def get_all_futures_symbols(self) -> List[str]:
         """Get all available USDT/USDC perpetual futures symbols"""
+        await self._use_weight(1)
         exchange_info = await self.client.futures_exchange_info()
         
+        quote_assets = PairFilterConfig.QUOTE_ASSETS
         symbols = []
         for s in exchange_info['symbols']:
             if s['contractType'] == 'PERPETUAL':
-                if s['quoteAsset'] in ['USDT', 'USDC']:
+                if s['quoteAsset'] in quote_assets:
                     if s['status'] == 'TRADING':
-                        symbols.append(s['symbol'])
+                        # Interned so later dict lookups/compares hit the identity fast path
+                        symbols.append(sys.intern(s['symbol']))
         
         logger.info(f"Found {len(symbols)} perpetual futures symbols")
         return symbols
     
-    async def get_ticker(self, symbol: str) -> Optional[TickerData]:
+    async def get_ticker(self, symbol: str, max_age: float = 2.0) -> Optional[TickerData]:
         """Get current ticker - from WebSocket cache if fresh, else REST API"""
         # Check WebSocket cache first
         if symbol in self.tickers:
             cached = self.tickers[symbol]
             age = time.time() - cached.timestamp
-            if age < 2.0:  # Data is fresh (under 2 seconds old)
+            if age < max_age:  # Data is fresh (under 2 seconds old by default)
                 return cached
 
         # Fallback to REST API
         return await self._fetch_ticker_rest(symbol)
 
+    async def get_tickers_cached(self, ttl: float = ALL_TICKERS_TTL) -> List[dict]:
+        """Get the raw 24h ticker list for every futures symbol, re-fetched at most once per ttl"""
+        async with self._all_tickers_lock:
+            if time.monotonic() - self._all_tickers_at >= ttl:
+                await self._use_weight(40)
+                self._all_tickers = await self.client.futures_ticker()
+                self._all_tickers_at = time.monotonic()
+            return self._all_tickers
+
+    async def refresh_all_tickers(self) -> int:
+        """Refresh the ticker cache for every futures symbol with a single REST call"""
+        try:
+            tickers = await self.get_tickers_cached()
+        except Exception as e:
+            logger.error(f"Error refreshing all tickers: {e}")
+            return 0
+
+        now = time.time()
+        for ticker in tickers:
+            symbol = ticker['symbol']
+            self.tickers[symbol] = TickerData(
+                symbol=symbol,
+                price=float(ticker['lastPrice']),
+                price_change_percent_24h=float(ticker['priceChangePercent']),
+                volume_24h=float(ticker['quoteVolume']),
+                high_24h=float(ticker['highPrice']),
+                low_24h=float(ticker['lowPrice']),
+                timestamp=now
+            )
+
+        return len(tickers)
+
     async def _fetch_ticker_rest(self, symbol: str) -> Optional[TickerData]:
         """Fetch ticker from REST API (fallback when WebSocket cache is stale)"""
         try:
+            await self._use_weight(1)
             ticker = await self.client.futures_ticker(symbol=symbol)
 
             data = TickerData(
@@ -274,6 +375,7 @@ class DataFeed:
     async def get_klines(self, symbol: str, interval: str = '5m', limit: int = 100) -> List[KlineData]:
         """Get historical klines"""
         try:
+            await self._use_weight(1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10)
             klines = await self.client.futures_klines(
                 symbol=symbol,
                 interval=interval,
@@ -304,6 +406,7 @@ class DataFeed:
     async def get_orderbook(self, symbol: str, limit: int = 20) -> Optional[OrderBookData]:
         """Get order book depth"""
         try:
+            await self._use_weight(2 if limit <= 50 else 5 if limit <= 100 else 10 if limit <= 500 else 20)
             depth = await self.client.futures_order_book(symbol=symbol, limit=limit)
             
             data = OrderBookData(
@@ -322,6 +425,7 @@ class DataFeed:
     async def get_funding_rate(self, symbol: str) -> Optional[FundingRateData]:
         """Get current funding rate"""
         try:
+            await self._use_weight(1)
             funding = await self.client.futures_funding_rate(symbol=symbol, limit=1)
             
             if funding:
@@ -342,6 +446,7 @@ class DataFeed:
     async def get_open_interest(self, symbol: str) -> Optional[float]:
         """Get open interest"""
         try:
+            await self._use_weight(1)
             oi = await self.client.futures_open_interest(symbol=symbol)
             value = float(oi['openInterest'])
             self.open_interest[symbol] = value
@@ -354,6 +459,7 @@ class DataFeed:
     async def get_account_balance(self) -> float:
         """Get total account equity across all assets"""
         try:
+            await self._use_weight(5)
             account = await self.client.futures_account()
 
             # Log all balances for debugging
@@ -366,7 +472,7 @@ class DataFeed:
             for asset in account.get('assets', []):
                 margin_balance = float(asset.get('marginBalance', 0))
                 if margin_balance > 0:
-                    logger.debug(f"Asset {asset['asset']}: marginBalance=${margin_balance:.2f}")
+                    logger.debug("Asset {}: marginBalance=${:.2f}", asset['asset'], margin_balance)
                     total_from_assets += margin_balance
 
             logger.info(f"💰 Account balances - totalMargin: ${total_margin:.2f}, "
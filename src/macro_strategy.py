@@ -20,6 +20,7 @@ from typing import Dict, List, Optional, Tuple
 from enum import Enum
 from loguru import logger
 import time
+import numpy as np
 
 
 class MacroDirection(Enum):
@@ -28,7 +29,7 @@ class MacroDirection(Enum):
     FLAT = "FLAT"
 
 
-@dataclass
+@dataclass(slots=True)
 class MacroConfig:
     """Configuration for macro strategy - 24H TIMEFRAME"""
     # MACRO INDICATOR THRESHOLDS (24H based - relaxed for action)
@@ -58,6 +59,13 @@ class MacroConfig:
 
     # SCAN INTERVAL
     SCAN_INTERVAL = 30  # Calculate macro every 30 seconds
+    STREAM_TICKER_MAX_AGE = 60  # Stream-cached 24h changes older than this fall back to REST
+    MONITOR_MAX_WAIT = 5  # Monitor re-checks after this long if no ticker batch arrives
+    MONITOR_IDLE_WAIT = 60  # Watchdog re-check while there are no positions (wakes early on add)
+    POSITION_SAVE_INTERVAL = 5  # Persist peak profits to Redis at most this often
+    SHUTDOWN_TIMEOUT = 5  # Max seconds to wait for background loops to exit on stop
+    ERROR_BACKOFF_BASE = 5  # First retry delay after a loop error (doubles per consecutive error)
+    ERROR_BACKOFF_MAX = 60  # Cap on the retry delay
 
 
 @dataclass
@@ -137,14 +145,17 @@ class MacroIndicator:
                 timestamp=time.time()
             )
 
+        # One float array shared by all three components
+        vel = np.fromiter(velocities.values(), dtype=np.float64, count=len(velocities))
+
         # Component 1: Majority Vote (24h)
-        majority_score, coins_up, coins_down = self._calculate_majority(velocities)
+        majority_score, coins_up, coins_down = self._calculate_majority(vel)
 
         # Component 2: Leader-Follower (24h)
-        leader_score, leader_velocity = self._calculate_leaders(velocities)
+        leader_score, leader_velocity = self._calculate_leaders(vel)
 
         # Component 3: Aggregate Velocity (24h average)
-        velocity_score, avg_velocity = self._calculate_aggregate(velocities)
+        velocity_score, avg_velocity = self._calculate_aggregate(vel)
 
         # Calculate total score
         total_score = majority_score + leader_score + velocity_score
@@ -201,9 +212,21 @@ class MacroIndicator:
         """Get 24-hour price change percent for all symbols from Binance tickers"""
         velocities = {}
 
+        # Prefer the websocket ticker cache; only go to REST if any symbol is missing or stale
+        cutoff = time.time() - self.config.STREAM_TICKER_MAX_AGE
+        cached = self.data_feed.tickers
+        for symbol in symbols:
+            ticker = cached.get(symbol)
+            if ticker is None or ticker.timestamp < cutoff:
+                break
+            velocities[symbol] = ticker.price_change_percent_24h
+        else:
+            return velocities
+        velocities.clear()
+
         try:
-            # Get all futures tickers at once (much faster than individual calls)
-            tickers = await self.data_feed.client.futures_ticker()
+            # Get all futures tickers at once (shared with other callers within the cache TTL)
+            tickers = await self.data_feed.get_tickers_cached()
 
             # Create lookup dict
             ticker_map = {t['symbol']: float(t['priceChangePercent']) for t in tickers}
@@ -227,7 +250,7 @@ class MacroIndicator:
 
         return velocities
 
-    def _calculate_majority(self, velocities: Dict[str, float]) -> Tuple[int, int, int]:
+    def _calculate_majority(self, velocities: np.ndarray) -> Tuple[int, int, int]:
         """
         Component 1: Majority Vote
 
@@ -235,12 +258,12 @@ class MacroIndicator:
             (score, coins_up, coins_down)
             score: +1 if 60%+ up, -1 if 60%+ down, 0 otherwise
         """
-        if not velocities:
+        if not velocities.size:
             return 0, 0, 0
 
-        coins_up = sum(1 for v in velocities.values() if v > 0)
-        coins_down = sum(1 for v in velocities.values() if v < 0)
-        total = len(velocities)
+        coins_up = int(np.count_nonzero(velocities > 0))
+        coins_down = int(np.count_nonzero(velocities < 0))
+        total = velocities.size
 
         up_ratio = coins_up / total
         down_ratio = coins_down / total
@@ -252,7 +275,7 @@ class MacroIndicator:
         else:
             return 0, coins_up, coins_down
 
-    def _calculate_leaders(self, velocities: Dict[str, float]) -> Tuple[int, float]:
+    def _calculate_leaders(self, velocities: np.ndarray) -> Tuple[int, float]:
         """
         Component 2: Leader-Follower Detection
 
@@ -260,19 +283,23 @@ class MacroIndicator:
             (score, leader_avg_velocity)
             score: +1 if top 10% are positive, -1 if negative
         """
-        if not velocities:
+        if not velocities.size:
             return 0, 0.0
 
-        # Sort by absolute velocity (biggest movers are leaders)
-        sorted_velocities = sorted(velocities.items(), key=lambda x: abs(x[1]), reverse=True)
-
-        # Get top 10% (leaders)
-        leader_count = max(1, int(len(sorted_velocities) * self.config.LEADER_PERCENT))
-        leaders = sorted_velocities[:leader_count]
+        # Get top 10% by absolute velocity (biggest movers are leaders)
+        leader_count = max(1, int(velocities.size * self.config.LEADER_PERCENT))
+        magnitudes = np.abs(velocities)
+        if leader_count < velocities.size:
+            # O(n) partition finds the cutoff; ties at the cutoff are taken in input order
+            cutoff = np.partition(magnitudes, velocities.size - leader_count)[velocities.size - leader_count]
+            above = magnitudes > cutoff
+            ties = np.flatnonzero(magnitudes == cutoff)[:leader_count - int(np.count_nonzero(above))]
+            leaders = np.concatenate((velocities[above], velocities[ties]))
+        else:
+            leaders = velocities
 
         # Calculate average velocity of leaders
-        leader_velocities = [v for _, v in leaders]
-        avg_leader_velocity = sum(leader_velocities) / len(leader_velocities)
+        avg_leader_velocity = float(leaders.mean())
 
         # Direction based on leader average
         if avg_leader_velocity > 0:
@@ -282,7 +309,7 @@ class MacroIndicator:
         else:
             return 0, avg_leader_velocity
 
-    def _calculate_aggregate(self, velocities: Dict[str, float]) -> Tuple[int, float]:
+    def _calculate_aggregate(self, velocities: np.ndarray) -> Tuple[int, float]:
         """
         Component 3: Aggregate Velocity
 
@@ -290,10 +317,10 @@ class MacroIndicator:
             (score, average_velocity)
             score: +1 if avg > +0.5%, -1 if avg < -0.5%
         """
-        if not velocities:
+        if not velocities.size:
             return 0, 0.0
 
-        avg_velocity = sum(velocities.values()) / len(velocities)
+        avg_velocity = float(velocities.mean())
 
         if avg_velocity >= self.config.AVG_VELOCITY_THRESHOLD:
             return 1, avg_velocity
@@ -302,6 +329,13 @@ class MacroIndicator:
         else:
             return 0, avg_velocity
 
+def compute_pnl(direction: str, entry_price: float, current_price: float,
+                margin: float, leverage: int) -> Tuple[float, float]:
+    """Return (pnl % on margin, pnl USD) for closing a position at current_price"""
+    sign = 1.0 if direction == "LONG" else -1.0
+    ratio = (current_price - entry_price) / entry_price * sign * leverage
+    return ratio * 100, margin * ratio
+
 
 class MacroExitManager:
     """
@@ -314,6 +348,10 @@ class MacroExitManager:
 
     def __init__(self, config: MacroConfig = None):
         self.config = config or MacroConfig()
+        # Exit thresholds resolved once instead of on every price check
+        self.sl_threshold = -self.config.STOP_LOSS_PERCENT
+        self.trailing_activation = self.config.TRAILING_ACTIVATION_PERCENT
+        self.trailing_distance = self.config.TRAILING_DISTANCE_PERCENT
 
     def check_exit(self, direction: str, entry_price: float, current_price: float, peak_profit_pct: float = 0.0) -> Optional[Dict]:
         """
@@ -336,19 +374,19 @@ class MacroExitManager:
             pnl_pct = ((entry_price - current_price) / entry_price) * 100
 
         # Check STOP LOSS - 3% hard stop (software monitoring)
-        if pnl_pct <= -self.config.STOP_LOSS_PERCENT:
+        if pnl_pct <= self.sl_threshold:
             return {
                 'action': 'close',
                 'reason': 'stop_loss',
                 'pnl_pct': pnl_pct,
-                'sl_threshold': -self.config.STOP_LOSS_PERCENT
+                'sl_threshold': self.sl_threshold
             }
 
         # Check TRAILING STOP - Lock in profits after big moves
         # Only active if we've reached the activation threshold
-        if peak_profit_pct >= self.config.TRAILING_ACTIVATION_PERCENT:
+        if peak_profit_pct >= self.trailing_activation:
             # Calculate trailing stop level (peak - distance)
-            trailing_stop_level = peak_profit_pct - self.config.TRAILING_DISTANCE_PERCENT
+            trailing_stop_level = peak_profit_pct - self.trailing_distance
 
             if pnl_pct <= trailing_stop_level:
                 return {
@@ -360,3 +398,46 @@ class MacroExitManager:
                 }
 
         return None
+
+    def check_exits(
+        self,
+        signs: np.ndarray,
+        entry_prices: np.ndarray,
+        current_prices: np.ndarray,
+        peak_profits: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, List[Tuple[int, Dict]]]:
+        """
+        Vectorized check_exit across many positions.
+
+        signs is +1 for LONG and -1 for SHORT. Peaks are raised to the current
+        PnL before the trailing check, matching the monitor loop.
+
+        Returns:
+            (pnl_pct, updated peak_profits, [(index, exit_action), ...])
+        """
+        pnl_pct = (current_prices - entry_prices) / entry_prices * 100 * signs
+        peaks = np.maximum(peak_profits, pnl_pct)
+        trail_levels = peaks - self.trailing_distance
+
+        stop_hit = pnl_pct <= self.sl_threshold
+        trail_hit = ~stop_hit & (peaks >= self.trailing_activation) & (pnl_pct <= trail_levels)
+
+        exits = []
+        for i in np.flatnonzero(stop_hit | trail_hit):
+            if stop_hit[i]:
+                exits.append((int(i), {
+                    'action': 'close',
+                    'reason': 'stop_loss',
+                    'pnl_pct': float(pnl_pct[i]),
+                    'sl_threshold': self.sl_threshold
+                }))
+            else:
+                exits.append((int(i), {
+                    'action': 'close',
+                    'reason': 'trailing_stop',
+                    'pnl_pct': float(pnl_pct[i]),
+                    'peak_pct': float(peaks[i]),
+                    'trail_level': float(trail_levels[i])
+                }))
+
+        return pnl_pct, peaks, exits
@@ -2,13 +2,24 @@
 Order Executor Module
 Executes orders on Binance Futures
 """
-from typing import Optional, Dict
+import asyncio
+from decimal import Decimal
+from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass
 from loguru import logger
+from asyncio_throttle import Throttler
 from binance.enums import *
 
 from config import LeverageConfig
 
+# Binance accepts at most 5 orders per /fapi/v1/batchOrders request
+BATCH_ORDER_LIMIT = 5
+# Cap on in-flight REST calls when fanning out across the whitelist
+MAX_CONCURRENT_ORDERS = 10
+# Binance USD-M allows 300 orders / 10s per account; keep ~20% headroom for retries and manual use
+ORDER_RATE_LIMIT = 240
+ORDER_RATE_PERIOD = 10.0
+
 
 @dataclass
 class OrderResult:
@@ -34,6 +45,11 @@ class OrderExecutor:
 
     def __init__(self, data_feed):
         self.data_feed = data_feed
+        self._order_sem = asyncio.Semaphore(MAX_CONCURRENT_ORDERS)
+        # Shared sliding-window limiter; every order placed by this executor takes one slot
+        self._order_throttle = Throttler(ORDER_RATE_LIMIT, ORDER_RATE_PERIOD)
+        # symbol -> (quantity_precision, price_precision, min_qty), filled from exchange info once
+        self._precisions: Dict[str, Tuple[int, int, float]] = {}
 
     @property
     def client(self):
@@ -41,8 +57,28 @@ class OrderExecutor:
         return self.data_feed.client
 
     async def initialize(self):
-        """Initialize with the Binance client (legacy, now automatic)"""
-        pass  # Client is now accessed via property
+        """Load symbol precisions (client is accessed via property)"""
+        await self.load_precisions()
+
+    async def load_precisions(self):
+        """Cache quantity/price precision and min quantity for every futures symbol"""
+        try:
+            exchange_info = await self.client.futures_exchange_info()
+
+            for s in exchange_info['symbols']:
+                # Get min quantity
+                min_qty = 0.001
+                for f in s['filters']:
+                    if f['filterType'] == 'LOT_SIZE':
+                        min_qty = float(f['minQty'])
+                        break
+
+                self._precisions[s['symbol']] = (s['quantityPrecision'], s['pricePrecision'], min_qty)
+
+            logger.info(f"Cached precisions for {len(self._precisions)} symbols")
+
+        except Exception as e:
+            logger.error(f"Error loading symbol precisions: {e}")
     
     async def set_leverage(self, symbol: str, leverage: int) -> bool:
         """Set leverage for a symbol"""
@@ -51,7 +87,7 @@ class OrderExecutor:
                 symbol=symbol,
                 leverage=leverage
             )
-            logger.debug(f"Leverage set to {leverage}x for {symbol}")
+            logger.debug("Leverage set to {}x for {}", leverage, symbol)
             return True
         except Exception as e:
             # Leverage might already be set
@@ -67,7 +103,7 @@ class OrderExecutor:
                 symbol=symbol,
                 marginType=margin_type
             )
-            logger.debug(f"Margin type set to {margin_type} for {symbol}")
+            logger.debug("Margin type set to {} for {}", margin_type, symbol)
             return True
         except Exception as e:
             # Margin type might already be set
@@ -78,28 +114,11 @@ class OrderExecutor:
     
     async def get_symbol_precision(self, symbol: str) -> tuple:
         """Get quantity and price precision for a symbol"""
-        try:
-            exchange_info = await self.client.futures_exchange_info()
-            
-            for s in exchange_info['symbols']:
-                if s['symbol'] == symbol:
-                    quantity_precision = s['quantityPrecision']
-                    price_precision = s['pricePrecision']
-                    
-                    # Get min quantity
-                    min_qty = 0.001
-                    for f in s['filters']:
-                        if f['filterType'] == 'LOT_SIZE':
-                            min_qty = float(f['minQty'])
-                            break
-                    
-                    return quantity_precision, price_precision, min_qty
-            
-            return 3, 2, 0.001
-            
-        except Exception as e:
-            logger.error(f"Error getting precision for {symbol}: {e}")
-            return 3, 2, 0.001
+        if not self._precisions:
+            # Not loaded at startup (or the load failed) - try once more
+            await self.load_precisions()
+
+        return self._precisions.get(symbol, (3, 2, 0.001))
     
     async def calculate_quantity(self, symbol: str, margin: float, leverage: int, price: float) -> float:
         """Calculate order quantity from margin amount - ensures $10 minimum notional"""
@@ -115,7 +134,7 @@ class OrderExecutor:
             min_notional = getattr(PositionSizingConfig, 'MIN_NOTIONAL_USD', 10.0)
             if notional < min_notional:
                 notional = min_notional
-                logger.debug(f"Boosted notional to ${min_notional} for {symbol}")
+                logger.debug("Boosted notional to ${} for {}", min_notional, symbol)
 
             # Quantity = notional / price
             quantity = notional / price
@@ -132,6 +151,138 @@ class OrderExecutor:
             logger.error(f"Error calculating quantity for {symbol}: {e}")
             return 0.0
     
+    async def _prepare_market_order(
+        self, symbol: str, margin: float, leverage: int
+    ) -> Tuple[float, float, Optional[str]]:
+        """Set leverage/margin type and size a market entry; returns (quantity, price, error)"""
+        # Set leverage
+        await self.set_leverage(symbol, leverage)
+        await self.set_margin_type(symbol, "CROSSED")
+
+        # Get current price
+        ticker = await self.data_feed.get_ticker(symbol)
+        if not ticker:
+            return 0, 0, "Could not get current price"
+
+        price = ticker.price
+        quantity = await self.calculate_quantity(symbol, margin, leverage, price)
+
+        if quantity <= 0:
+            return 0, price, "Invalid quantity"
+
+        return quantity, price, None
+
+    async def _prepare_bounded(self, symbol: str, margin: float, leverage: int) -> Tuple[float, float, Optional[str]]:
+        """_prepare_market_order under the fan-out semaphore, with errors folded into the result"""
+        async with self._order_sem:
+            try:
+                return await self._prepare_market_order(symbol, margin, leverage)
+            except Exception as e:
+                return 0, 0, str(e)
+
+    async def _place_batch_bounded(self, batch: List[dict]):
+        """Submit one batchOrders request under the fan-out semaphore"""
+        # Each order in the batch counts against the exchange order limit
+        for _ in batch:
+            await self._order_throttle.acquire()
+        async with self._order_sem:
+            return await self.client.futures_place_batch_order(batchOrders=batch)
+
+    async def _create_order(self, **params) -> dict:
+        """Place a single order through the shared rate limiter"""
+        async with self._order_throttle:
+            return await self.client.futures_create_order(**params)
+
+    async def _submit_batches(self, orders: List[dict]) -> List[dict]:
+        """Send orders via batchOrders in chunks of 5; returns one response per order, in order"""
+        chunks = [orders[i:i + BATCH_ORDER_LIMIT] for i in range(0, len(orders), BATCH_ORDER_LIMIT)]
+        responses = await asyncio.gather(
+            *(self._place_batch_bounded(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+
+        flat: List[dict] = []
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                logger.error(f"Batch order request failed: {response}")
+                response = [{'msg': str(response)}] * len(chunk)
+            flat.extend(response)
+        return flat
+
+    async def open_positions_batch(
+        self,
+        symbols: List[str],
+        direction: str,
+        margin: float,
+        leverage: int
+    ) -> List[OrderResult]:
+        """Open market positions on many symbols via batchOrders (5 orders per request)"""
+        side = SIDE_BUY if direction == "LONG" else SIDE_SELL
+        results: List[OrderResult] = []
+        pending: List[Tuple[dict, float]] = []
+
+        prepared = await asyncio.gather(
+            *(self._prepare_bounded(symbol, margin, leverage) for symbol in symbols)
+        )
+
+        for symbol, (quantity, price, error) in zip(symbols, prepared):
+            if error:
+                results.append(OrderResult(
+                    success=False, order_id=None, symbol=symbol,
+                    side=side, quantity=0, price=price, error=error
+                ))
+                continue
+
+            # batchOrders params are sent as a JSON array of strings
+            params = {
+                'symbol': symbol,
+                'side': side,
+                'type': ORDER_TYPE_MARKET,
+                'quantity': format(Decimal(str(quantity)), 'f'),
+            }
+            pending.append((params, price))
+
+        responses = await self._submit_batches([params for params, _ in pending])
+
+        placed: List[OrderResult] = []
+        for (params, price), order in zip(pending, responses):
+            symbol = params['symbol']
+            if 'orderId' not in order:
+                results.append(OrderResult(
+                    success=False, order_id=None, symbol=symbol,
+                    side=side, quantity=0, price=price,
+                    error=order.get('msg', 'Order rejected')
+                ))
+                continue
+
+            quantity = float(params['quantity'])
+            icon = "🟢" if direction == "LONG" else "🔴"
+            logger.info("{} {} opened: {} | Qty: {} | Price: ~{}", icon, direction, symbol, quantity, price)
+            placed.append(OrderResult(
+                success=True,
+                order_id=str(order['orderId']),
+                symbol=symbol,
+                side=side,
+                quantity=quantity,
+                price=float(order.get('avgPrice', 0)) or price
+            ))
+
+        # Market orders ack with avgPrice 0 - read real entry prices in one request
+        if placed:
+            try:
+                positions = await self.client.futures_position_information()
+                entry_prices = {
+                    p['symbol']: float(p['entryPrice'])
+                    for p in positions if float(p['positionAmt']) != 0
+                }
+                for result in placed:
+                    if entry_prices.get(result.symbol, 0) > 0:
+                        result.price = entry_prices[result.symbol]
+            except Exception as e:
+                logger.debug(f"Could not fetch entry prices, using ticker prices: {e}")
+
+        return placed + results
+
     async def open_long(
         self, 
         symbol: str, 
@@ -141,38 +292,23 @@ class OrderExecutor:
     ) -> OrderResult:
         """Open a long position"""
         try:
-            # Set leverage
-            await self.set_leverage(symbol, leverage)
-            await self.set_margin_type(symbol, "CROSSED")
-            
-            # Get current price
-            ticker = await self.data_feed.get_ticker(symbol)
-            if not ticker:
-                return OrderResult(
-                    success=False, order_id=None, symbol=symbol,
-                    side="BUY", quantity=0, price=0,
-                    error="Could not get current price"
-                )
-            
-            price = ticker.price
-            quantity = await self.calculate_quantity(symbol, margin, leverage, price)
-            
-            if quantity <= 0:
+            quantity, price, error = await self._prepare_market_order(symbol, margin, leverage)
+            if error:
                 return OrderResult(
                     success=False, order_id=None, symbol=symbol,
                     side="BUY", quantity=0, price=price,
-                    error="Invalid quantity"
+                    error=error
                 )
             
             # Place market order
-            order = await self.client.futures_create_order(
+            order = await self._create_order(
                 symbol=symbol,
                 side=SIDE_BUY,
                 type=ORDER_TYPE_MARKET,
                 quantity=quantity
             )
             
-            logger.info(f"🟢 LONG opened: {symbol} | Qty: {quantity} | Price: ~{price}")
+            logger.info("🟢 LONG opened: {} | Qty: {} | Price: ~{}", symbol, quantity, price)
 
             # Set stop-loss if provided
             if stop_loss:
@@ -220,38 +356,23 @@ class OrderExecutor:
     ) -> OrderResult:
         """Open a short position"""
         try:
-            # Set leverage
-            await self.set_leverage(symbol, leverage)
-            await self.set_margin_type(symbol, "CROSSED")
-            
-            # Get current price
-            ticker = await self.data_feed.get_ticker(symbol)
-            if not ticker:
-                return OrderResult(
-                    success=False, order_id=None, symbol=symbol,
-                    side="SELL", quantity=0, price=0,
-                    error="Could not get current price"
-                )
-            
-            price = ticker.price
-            quantity = await self.calculate_quantity(symbol, margin, leverage, price)
-            
-            if quantity <= 0:
+            quantity, price, error = await self._prepare_market_order(symbol, margin, leverage)
+            if error:
                 return OrderResult(
                     success=False, order_id=None, symbol=symbol,
                     side="SELL", quantity=0, price=price,
-                    error="Invalid quantity"
+                    error=error
                 )
             
             # Place market order
-            order = await self.client.futures_create_order(
+            order = await self._create_order(
                 symbol=symbol,
                 side=SIDE_SELL,
                 type=ORDER_TYPE_MARKET,
                 quantity=quantity
             )
             
-            logger.info(f"🔴 SHORT opened: {symbol} | Qty: {quantity} | Price: ~{price}")
+            logger.info("🔴 SHORT opened: {} | Qty: {} | Price: ~{}", symbol, quantity, price)
 
             # Set stop-loss if provided
             if stop_loss:
@@ -298,7 +419,7 @@ class OrderExecutor:
 
             side = SIDE_SELL if direction == "LONG" else SIDE_BUY
 
-            order = await self.client.futures_create_order(
+            order = await self._create_order(
                 symbol=symbol,
                 side=side,
                 type=FUTURE_ORDER_TYPE_STOP_MARKET,
@@ -362,10 +483,10 @@ class OrderExecutor:
             # CRITICAL: Cancel ALL orders BEFORE closing to avoid orphaned SL/TP orders
             if percent >= 100:
                 await self.cancel_all_orders(symbol)
-                logger.info(f"🧹 Cancelled all orders for {symbol} before full close")
+                logger.info("🧹 Cancelled all orders for {} before full close", symbol)
 
             # Close position
-            order = await self.client.futures_create_order(
+            order = await self._create_order(
                 symbol=symbol,
                 side=side,
                 type=ORDER_TYPE_MARKET,
@@ -373,7 +494,7 @@ class OrderExecutor:
                 reduceOnly=True
             )
 
-            logger.info(f"📤 Position closed: {symbol} {direction} | {percent}% | Qty: {close_qty}")
+            logger.info("📤 Position closed: {} {} | {}% | Qty: {}", symbol, direction, percent, close_qty)
 
             return OrderResult(
                 success=True,
@@ -396,7 +517,7 @@ class OrderExecutor:
         """Cancel all open orders for a symbol"""
         try:
             await self.client.futures_cancel_all_open_orders(symbol=symbol)
-            logger.debug(f"All orders cancelled for {symbol}")
+            logger.debug("All orders cancelled for {}", symbol)
         except Exception as e:
             logger.error(f"Error cancelling orders for {symbol}: {e}")
     
@@ -426,6 +547,59 @@ class OrderExecutor:
         except Exception as e:
             logger.error(f"Error updating stop-loss for {symbol}: {e}")
     
+    async def close_positions(self, symbols: List[str]) -> List[OrderResult]:
+        """Fully close many positions concurrently (bounded), results in input order"""
+        async def _close(symbol: str) -> OrderResult:
+            async with self._order_sem:
+                return await self.close_position(symbol, percent=100)
+
+        return await asyncio.gather(*(_close(symbol) for symbol in symbols))
+
+    async def close_positions_batch(self, positions: List[dict]) -> List[OrderResult]:
+        """
+        Fully close exchange positions (futures_position_information entries) with
+        reduceOnly market orders sent through batchOrders. Results are in input order.
+        """
+        # Cancel resting orders first so no SL/TP is orphaned by the close
+        async def _cancel(symbol: str):
+            async with self._order_sem:
+                await self.cancel_all_orders(symbol)
+
+        await asyncio.gather(*(_cancel(p['symbol']) for p in positions))
+
+        orders = []
+        for p in positions:
+            amt = p['positionAmt']
+            orders.append({
+                'symbol': p['symbol'],
+                'side': SIDE_SELL if float(amt) > 0 else SIDE_BUY,
+                'type': ORDER_TYPE_MARKET,
+                'quantity': amt.lstrip('-'),  # Already at exchange precision
+                'reduceOnly': 'true',
+            })
+
+        responses = await self._submit_batches(orders)
+
+        results = []
+        for params, order in zip(orders, responses):
+            if 'orderId' not in order:
+                results.append(OrderResult(
+                    success=False, order_id=None, symbol=params['symbol'],
+                    side=params['side'], quantity=0, price=0,
+                    error=order.get('msg', 'Order rejected')
+                ))
+                continue
+
+            results.append(OrderResult(
+                success=True,
+                order_id=str(order['orderId']),
+                symbol=params['symbol'],
+                side=params['side'],
+                quantity=float(params['quantity']),
+                price=float(order.get('avgPrice', 0))
+            ))
+        return results
+
     async def close_long(self, symbol: str) -> OrderResult:
         """Close a long position (convenience wrapper)"""
         return await self.close_position(symbol, percent=100)
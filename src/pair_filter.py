@@ -2,14 +2,19 @@
 Pair Filter Module
 Filters and categorizes trading pairs by tier for scanning priority
 """
+import asyncio
 from enum import Enum
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 from loguru import logger
+import heapq
 import time
 
 from config import PairFilterConfig
 
+# Cap on concurrent filter checks (each may hit the order book REST endpoint)
+MAX_CONCURRENT_CHECKS = 8
+
 
 class PairTier(Enum):
     TIER_1_HOT = 1  # New listings, volume exploding
@@ -45,7 +50,15 @@ class PairFilter:
         self.memecoins = {"DOGEUSDT", "SHIBUSDT", "PEPEUSDT", "BONKUSDT", "FLOKIUSDT", 
                          "WIFUSDT", "MEMEUSDT", "BOMEUSDT"}
         self.ai_sector = {"FETUSDT", "AGIXUSDT", "RNDRUSDT", "TAOUSDT", "ARKMUSDT"}
+        # Combined once so tier checks do a single set lookup
+        self.hot_watchlist = frozenset(self.memecoins | self.ai_sector)
         self.new_listings: Set[str] = set()
+
+        # Scan schedule: min-heap of (due_time, symbol); stale entries are skipped lazily
+        self._scan_heap: List[Tuple[float, str]] = []
+        self._scan_due: Dict[str, float] = {}
+
+        self._check_sem = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
     
     async def initialize(self) -> List[str]:
         """Initialize pair list and categorize"""
@@ -57,10 +70,12 @@ class PairFilter:
 
         all_symbols = await self.data_feed.get_all_futures_symbols()
 
-        valid_pairs = []
-        for symbol in all_symbols:
-            if await self._passes_filters(symbol):
-                valid_pairs.append(symbol)
+        # One bulk ticker request instead of a REST call per symbol
+        await self.data_feed.refresh_all_tickers()
+
+        # Filter checks are independent - run them concurrently, bounded by the semaphore
+        passed = await asyncio.gather(*(self._passes_filters_bounded(s) for s in all_symbols))
+        valid_pairs = [symbol for symbol, ok in zip(all_symbols, passed) if ok]
 
         logger.info(f"Filtered to {len(valid_pairs)} valid pairs from {len(all_symbols)} total")
         
@@ -69,6 +84,11 @@ class PairFilter:
         
         return valid_pairs
     
+    async def _passes_filters_bounded(self, symbol: str) -> bool:
+        """_passes_filters under the concurrency semaphore"""
+        async with self._check_sem:
+            return await self._passes_filters(symbol)
+
     async def _passes_filters(self, symbol: str) -> bool:
         """Check if symbol passes all inclusion/exclusion filters"""
 
@@ -93,7 +113,7 @@ class PairFilter:
 
         try:
             # Get ticker data
-            ticker = await self.data_feed.get_ticker(symbol)
+            ticker = await self.data_feed.get_ticker(symbol, max_age=self.config.TICKER_MAX_AGE)
             if not ticker:
                 return False
 
@@ -139,6 +159,7 @@ class PairFilter:
                 spread_percent=spread,
                 scan_interval=self._get_scan_interval(tier)
             )
+            self._schedule_scan(symbol)
         
         # Log tier distribution
         tier_counts = {t: 0 for t in PairTier}
@@ -157,7 +178,7 @@ class PairFilter:
         if symbol in self.new_listings:
             return PairTier.TIER_1_HOT
         
-        if symbol in self.memecoins or symbol in self.ai_sector:
+        if symbol in self.hot_watchlist:
             return PairTier.TIER_1_HOT
         
         ticker = self.data_feed.tickers.get(symbol)
@@ -186,21 +207,38 @@ class PairFilter:
         }
         return intervals.get(tier, 10)
     
+    def _schedule_scan(self, symbol: str):
+        """(Re)schedule a pair's next scan from its last scan time and interval"""
+        info = self.pairs[symbol]
+        due = info.last_scan + info.scan_interval
+        self._scan_due[symbol] = due
+        heapq.heappush(self._scan_heap, (due, symbol))
+
     def get_pairs_to_scan(self) -> List[str]:
         """Get pairs that need scanning based on their interval"""
         now = time.time()
-        to_scan = []
-        
-        for symbol, info in self.pairs.items():
-            if now - info.last_scan >= info.scan_interval:
-                to_scan.append(symbol)
-        
-        return to_scan
-    
+        heap = self._scan_heap
+        due_entries = []
+
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            due, symbol = entry
+            # Skip entries superseded by a reschedule or a removed pair
+            if symbol not in self.pairs or self._scan_due.get(symbol) != due:
+                continue
+            due_entries.append(entry)
+
+        # Pairs stay due until mark_scanned() reschedules them
+        for entry in due_entries:
+            heapq.heappush(heap, entry)
+
+        return [symbol for _, symbol in due_entries]
+
     def mark_scanned(self, symbol: str):
         """Mark a pair as just scanned"""
         if symbol in self.pairs:
             self.pairs[symbol].last_scan = time.time()
+            self._schedule_scan(symbol)
     
     def add_new_listing(self, symbol: str):
         """Add a new listing to hot tier"""
@@ -209,6 +247,7 @@ class PairFilter:
         if symbol in self.pairs:
             self.pairs[symbol].tier = PairTier.TIER_1_HOT
             self.pairs[symbol].scan_interval = self.config.TIER_1_INTERVAL
+            self._schedule_scan(symbol)
         
         logger.info(f"🆕 New listing added to TIER 1: {symbol}")
     
@@ -217,14 +256,25 @@ class PairFilter:
         if symbol in self.pairs:
             self.pairs[symbol].tier = PairTier.TIER_1_HOT
             self.pairs[symbol].scan_interval = self.config.TIER_1_INTERVAL
+            self._schedule_scan(symbol)
     
     async def refresh_categories(self):
         """Refresh pair categories (call periodically)"""
-        for symbol in list(self.pairs.keys()):
+        await self.data_feed.refresh_all_tickers()
+
+        # Re-check filters concurrently (bounded); apply the results in order below
+        symbols = list(self.pairs.keys())
+        passed = await asyncio.gather(
+            *(self._passes_filters_bounded(s) for s in symbols), return_exceptions=True
+        )
+
+        for symbol, ok in zip(symbols, passed):
             try:
-                # Re-check filters
-                if not await self._passes_filters(symbol):
+                if isinstance(ok, Exception):
+                    raise ok
+                if not ok:
                     del self.pairs[symbol]
+                    self._scan_due.pop(symbol, None)
                     self.excluded_pairs.add(symbol)
                     continue
                 
@@ -232,6 +282,7 @@ class PairFilter:
                 tier = await self._determine_tier(symbol)
                 self.pairs[symbol].tier = tier
                 self.pairs[symbol].scan_interval = self._get_scan_interval(tier)
+                self._schedule_scan(symbol)
                 
                 # Update volume
                 ticker = self.data_feed.tickers.get(symbol)
@@ -7,7 +7,10 @@ from dataclasses import dataclass
 from loguru import logger
 import time
 
-from config import PositionSizingConfig, INITIAL_EQUITY
+from config import (
+    PositionSizingConfig, INITIAL_EQUITY,
+    MAX_MARGIN_FRACTION, RECALC_EQUITY_CHANGE_FRACTION,
+)
 
 
 @dataclass
@@ -89,7 +92,7 @@ class PositionSizer:
         """
         min_margin = self.config.MIN_MARGIN_USD
         max_trades = self.config.MAX_CONCURRENT_TRADES
-        max_percent = self.config.MAX_MARGIN_PERCENT / 100
+        max_percent = MAX_MARGIN_FRACTION
         
         # Base margin to allow ~30 trades
         base_margin = equity / max_trades
@@ -109,7 +112,7 @@ class PositionSizer:
         # Trigger 1: Equity changed ±10%
         if self.equity_snapshot > 0:
             change = abs(current_equity - self.equity_snapshot) / self.equity_snapshot
-            if change >= self.config.RECALC_EQUITY_CHANGE_PERCENT / 100:
+            if change >= RECALC_EQUITY_CHANGE_FRACTION:
                 return True
         
         # Trigger 2: All positions closed
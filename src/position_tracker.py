@@ -5,8 +5,10 @@ Tracks all open positions and syncs with exchange
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from loguru import logger
+import asyncio
 import time
-import json
+import orjson
+import sys
 import redis.asyncio as redis
 
 from config import REDIS_URL, REDIS_PREFIX
@@ -46,6 +48,9 @@ class TrackedPosition:
         # Handle missing peak_profit_pct for backwards compatibility
         if 'peak_profit_pct' not in data:
             data['peak_profit_pct'] = 0.0
+        # Strings decoded from Redis are fresh objects; intern the ones compared every tick
+        data['symbol'] = sys.intern(data['symbol'])
+        data['direction'] = sys.intern(data['direction'])
         return cls(**data)
 
 
@@ -58,8 +63,35 @@ class PositionTracker:
     def __init__(self, data_feed):
         self.data_feed = data_feed
         self.positions: Dict[str, TrackedPosition] = {}
+        # Same positions sharded by direction: "LONG"/"SHORT" -> symbol -> position
+        self._by_direction: Dict[str, Dict[str, TrackedPosition]] = {"LONG": {}, "SHORT": {}}
+        # Bumped whenever a position is added or removed, so callers can cache derived views
+        self.version = 0
+        # Set when in-place field updates (e.g. peak profit) haven't been persisted yet
+        self._dirty = False
+        # Encoded /positions response body, rebuilt after any change
+        self._snapshot: Optional[bytes] = None
+        # Set whenever a position is tracked, so idle waiters wake immediately
+        self.position_added = asyncio.Event()
         self.redis: Optional[redis.Redis] = None
         self._redis_key = f"{REDIS_PREFIX}positions"
+
+    def _set_position(self, position: TrackedPosition):
+        """Insert/replace a position in the main dict and its direction shard"""
+        self._drop_position(position.symbol)
+        self.positions[position.symbol] = position
+        self._by_direction.setdefault(position.direction, {})[position.symbol] = position
+        self.version += 1
+        self._snapshot = None
+        self.position_added.set()
+
+    def _drop_position(self, symbol: str):
+        """Remove a position from the main dict and its direction shard"""
+        position = self.positions.pop(symbol, None)
+        if position:
+            self._by_direction.get(position.direction, {}).pop(symbol, None)
+            self.version += 1
+            self._snapshot = None
     
     async def initialize(self):
         """Initialize Redis connection and load positions"""
@@ -86,7 +118,7 @@ class PositionTracker:
         try:
             data = await self.redis.get(self._redis_key)
             if data:
-                positions_data = json.loads(data)
+                positions_data = orjson.loads(data)
                 loaded = 0
                 skipped = 0
                 for symbol, pos_dict in positions_data.items():
@@ -97,7 +129,7 @@ class PositionTracker:
                         logger.warning(f"Skipping invalid position from Redis: {symbol} (entry_price={entry_price}, leverage={leverage})")
                         skipped += 1
                         continue
-                    self.positions[symbol] = TrackedPosition.from_dict(pos_dict)
+                    self._set_position(TrackedPosition.from_dict(pos_dict))
                     loaded += 1
 
                 logger.info(f"Loaded {loaded} positions from Redis (skipped {skipped} invalid)")
@@ -112,10 +144,32 @@ class PositionTracker:
         
         try:
             data = {symbol: pos.to_dict() for symbol, pos in self.positions.items()}
-            await self.redis.set(self._redis_key, json.dumps(data))
+            await self.redis.set(self._redis_key, orjson.dumps(data))
+            self._dirty = False
         except Exception as e:
             logger.error(f"Error saving positions to Redis: {e}")
     
+    async def wait_for_positions(self, timeout: float) -> bool:
+        """Wait until at least one position is tracked; returns False on timeout"""
+        if self.positions:
+            return True
+        self.position_added.clear()
+        try:
+            await asyncio.wait_for(self.position_added.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def mark_dirty(self):
+        """Flag in-place position changes for the next flush()"""
+        self._dirty = True
+        self._snapshot = None
+
+    async def flush(self):
+        """Persist positions only if something changed since the last save"""
+        if self._dirty:
+            await self._save_to_redis()
+
     async def sync_with_exchange(self):
         """Sync local tracking with actual exchange positions"""
         try:
@@ -145,9 +199,10 @@ class PositionTracker:
                     # Update existing
                     self.positions[symbol].quantity = ex_pos['quantity']
                     self.positions[symbol].unrealized_pnl = ex_pos['unrealized_pnl']
+                    self.mark_dirty()
                 else:
                     # New position not tracked locally (maybe opened manually)
-                    self.positions[symbol] = TrackedPosition(
+                    self._set_position(TrackedPosition(
                         symbol=symbol,
                         direction=ex_pos['direction'],
                         entry_price=ex_pos['entry_price'],
@@ -157,13 +212,13 @@ class PositionTracker:
                         entry_time=time.time(),
                         order_id="SYNCED",
                         unrealized_pnl=ex_pos['unrealized_pnl']
-                    )
+                    ))
                     logger.info(f"📥 Synced position from exchange: {symbol}")
             
             # Remove closed positions
             for symbol in list(self.positions.keys()):
                 if symbol not in exchange_positions:
-                    del self.positions[symbol]
+                    self._drop_position(symbol)
                     logger.info(f"📤 Position no longer on exchange: {symbol}")
             
             # Save to Redis
@@ -197,28 +252,33 @@ class PositionTracker:
             current_price=entry_price
         )
         
-        self.positions[symbol] = position
+        self._set_position(position)
         await self._save_to_redis()
         
-        logger.info(f"📍 Position tracked: {symbol} {direction} @ {entry_price}")
+        logger.info("📍 Position tracked: {} {} @ {}", symbol, direction, entry_price)
     
     async def update_position(self, symbol: str, current_price: float, unrealized_pnl: float):
         """Update position with current market data"""
         if symbol in self.positions:
             self.positions[symbol].current_price = current_price
             self.positions[symbol].unrealized_pnl = unrealized_pnl
+            self.mark_dirty()
     
-    async def remove_position(self, symbol: str):
-        """Remove a position from tracking"""
+    async def remove_position(self, symbol: str, save: bool = True):
+        """Remove a position from tracking (save=False defers persistence to flush())"""
         if symbol in self.positions:
-            del self.positions[symbol]
-            await self._save_to_redis()
-            logger.info(f"📤 Position removed from tracking: {symbol}")
+            self._drop_position(symbol)
+            if save:
+                await self._save_to_redis()
+            else:
+                self.mark_dirty()
+            logger.info("📤 Position removed from tracking: {}", symbol)
     
     async def reduce_position(self, symbol: str, reduce_percent: float):
         """Reduce position quantity after partial close"""
         if symbol in self.positions:
             self.positions[symbol].quantity *= (1 - reduce_percent / 100)
+            self.mark_dirty()
             
             if self.positions[symbol].quantity <= 0:
                 await self.remove_position(symbol)
@@ -237,6 +297,16 @@ class PositionTracker:
         """Get all tracked positions"""
         return list(self.positions.values())
     
+    def get_positions_json(self) -> bytes:
+        """Get the /positions JSON body (cached until a position changes)"""
+        if self._snapshot is None:
+            self._snapshot = orjson.dumps({"positions": [str(p) for p in self.positions.values()]})
+        return self._snapshot
+
+    def get_positions_by_direction(self, direction: str) -> List[TrackedPosition]:
+        """Get tracked positions for one direction ("LONG"/"SHORT")"""
+        return list(self._by_direction.get(direction, {}).values())
+
     def get_position_count(self) -> int:
         """Get number of open positions"""
         return len(self.positions)
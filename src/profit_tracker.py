@@ -92,8 +92,19 @@ class ProfitTracker:
         self.trades: List[Trade] = []
         self.start_time = datetime.now().isoformat()
         self.start_balance = 0.0
+        # Derived views, rebuilt lazily after the trade log changes
+        self._metrics: Optional[PerformanceMetrics] = None
+        self._report: Optional[str] = None
+        # Bumped on every invalidation so callers can key their own caches on it
+        self.version = 0
         self._load()
 
+    def _invalidate(self):
+        """Drop cached metrics/report after trades or balance change"""
+        self._metrics = None
+        self._report = None
+        self.version += 1
+
     def _load(self):
         """Load existing trades from file"""
         try:
@@ -111,6 +122,8 @@ class ProfitTracker:
 
     def _save(self):
         """Save trades to file"""
+        # Every mutation persists through here, so it doubles as the cache invalidation point
+        self._invalidate()
         try:
             os.makedirs(os.path.dirname(self.tracker_file), exist_ok=True)
             with open(self.tracker_file, 'w') as f:
@@ -129,9 +142,13 @@ class ProfitTracker:
         self._save()
         logger.info(f"📊 Profit tracking started. Balance: ${balance:.2f}")
 
+    def save(self):
+        """Persist trades recorded with save=False"""
+        self._save()
+
     def record_entry(self, symbol: str, direction: str, entry_price: float,
-                     leverage: int, margin: float, velocity: float) -> str:
-        """Record a new trade entry"""
+                     leverage: int, margin: float, velocity: float, save: bool = True) -> str:
+        """Record a new trade entry (save=False defers the file write to save())"""
         trade_id = f"{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
         trade = Trade(
@@ -146,14 +163,17 @@ class ProfitTracker:
         )
 
         self.trades.append(trade)
-        self._save()
+        if save:
+            self._save()
+        else:
+            self._invalidate()
 
-        logger.info(f"📝 Trade recorded: {trade_id} | {direction} {symbol} @ ${entry_price:.6f}")
+        logger.info("📝 Trade recorded: {} | {} {} @ ${:.6f}", trade_id, direction, symbol, entry_price)
         return trade_id
 
     def record_exit(self, symbol: str, exit_price: float, exit_reason: str,
-                    pnl_percent: float, pnl_usd: float, peak_profit: float = 0.0):
-        """Record trade exit"""
+                    pnl_percent: float, pnl_usd: float, peak_profit: float = 0.0, save: bool = True):
+        """Record trade exit (save=False defers the file write to save())"""
         # Find the open trade for this symbol
         for trade in reversed(self.trades):
             if trade.symbol == symbol and trade.exit_time is None:
@@ -169,10 +189,13 @@ class ProfitTracker:
                 exit_dt = datetime.fromisoformat(trade.exit_time)
                 trade.duration_seconds = int((exit_dt - entry_dt).total_seconds())
 
-                self._save()
+                if save:
+                    self._save()
+                else:
+                    self._invalidate()
 
                 status = "✅" if pnl_usd > 0 else "❌"
-                logger.info(f"{status} Trade closed: {symbol} | {exit_reason} | PnL: ${pnl_usd:+.2f} ({pnl_percent:+.2f}%)")
+                logger.info("{} Trade closed: {} | {} | PnL: ${:+.2f} ({:+.2f}%)", status, symbol, exit_reason, pnl_usd, pnl_percent)
                 return
 
         logger.warning(f"No open trade found for {symbol}")
@@ -183,9 +206,16 @@ class ProfitTracker:
             if trade.symbol == symbol and trade.exit_time is None:
                 if current_profit > trade.peak_profit:
                     trade.peak_profit = current_profit
+                    self._invalidate()
                 return
 
     def get_metrics(self) -> PerformanceMetrics:
+        """Get current performance metrics (cached until the next trade change)"""
+        if self._metrics is None:
+            self._metrics = self._calculate_metrics()
+        return self._metrics
+
+    def _calculate_metrics(self) -> PerformanceMetrics:
         """Calculate current performance metrics"""
         metrics = PerformanceMetrics()
 
@@ -269,8 +299,21 @@ class ProfitTracker:
 
         return metrics
 
+    def get_report(self) -> str:
+        """Get the formatted performance report (cached until the next trade change)"""
+        if self._report is None:
+            self._report = self._build_report()
+        return self._report
+
     def print_report(self):
         """Print performance report"""
+        report = self.get_report()
+        print(report)
+        logger.info(report)
+        return report
+
+    def _build_report(self) -> str:
+        """Format performance report"""
         m = self.get_metrics()
 
         report = f"""
@@ -325,8 +368,6 @@ Capture Efficiency: {m.capture_efficiency:.1f}%
 
 ================================================================================
 """
-        print(report)
-        logger.info(report)
         return report
 
     def get_open_trades(self) -> List[Trade]:
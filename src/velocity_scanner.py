@@ -9,13 +9,17 @@ TIER SYSTEM (aligned with MoonshotDetector):
 - Tier 3: 1.5%+ in 1min = MICRO entry (consecutive candles)
 """
 import time
-from datetime import datetime, timezone
+from bisect import bisect_left, bisect_right
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from collections import defaultdict
 from loguru import logger
 
-from config import MoonshotDetectionConfig
+from config import (
+    TIER1_VELOCITY_5M, TIER2_VELOCITY_5M, TIER3_VELOCITY_1M,
+    PEAK_HOUR_MASK,
+    TIER_THRESHOLDS_OFFPEAK, TIER_THRESHOLDS_PEAK, ALERT_COOLDOWN,
+)
 
 
 @dataclass
@@ -48,16 +52,18 @@ class VelocityScanner:
     """
 
     def __init__(self):
-        # Track price snapshots: symbol -> [(timestamp, price), ...]
-        self.price_snapshots: Dict[str, List[Tuple[float, float]]] = defaultdict(list)
+        # Track price snapshots as parallel arrays: symbol -> [timestamp, ...] / [price, ...]
+        # Timestamps are appended in order, so window lookups can bisect
+        self.snapshot_times: Dict[str, List[float]] = defaultdict(list)
+        self.snapshot_prices: Dict[str, List[float]] = defaultdict(list)
 
         # TIER-ALIGNED THRESHOLDS (from MoonshotDetectionConfig)
         # Tier 1: Instant entry - bypasses all checks
-        self.TIER1_VELOCITY_5MIN = MoonshotDetectionConfig.TIER1_VELOCITY_5M  # 2.5%
+        self.TIER1_VELOCITY_5MIN = TIER1_VELOCITY_5M  # 2.5%
         # Tier 2: Fast entry
-        self.TIER2_VELOCITY_5MIN = MoonshotDetectionConfig.TIER2_VELOCITY_5M  # 1.5%
+        self.TIER2_VELOCITY_5MIN = TIER2_VELOCITY_5M  # 1.5%
         # Tier 3: Micro detection
-        self.TIER3_VELOCITY_1MIN = MoonshotDetectionConfig.TIER3_VELOCITY_1M  # 1.5%
+        self.TIER3_VELOCITY_1MIN = TIER3_VELOCITY_1M  # 1.5%
 
         # Legacy thresholds (for backwards compatibility)
         self.VELOCITY_1MIN = 1.5      # 1.5% in 1 minute = HIGH priority
@@ -69,12 +75,17 @@ class VelocityScanner:
         self.VELOCITY_5MIN_EARLY = 1.2   # 1.2% in 5 min = early warning
 
         # Peak hours (53% of moonshots start 18:00-00:00 UTC)
-        self.PEAK_HOURS_UTC = MoonshotDetectionConfig.PEAK_HOURS_UTC
-        self.PEAK_THRESHOLD_REDUCTION = MoonshotDetectionConfig.PEAK_HOUR_THRESHOLD_REDUCTION
+        self.PEAK_HOUR_MASK = PEAK_HOUR_MASK
+        self.TIER_THRESHOLDS_OFFPEAK = TIER_THRESHOLDS_OFFPEAK
+        self.TIER_THRESHOLDS_PEAK = TIER_THRESHOLDS_PEAK
 
-        # Cooldown tracking: symbol -> last_alert_time
-        self.last_alerts: Dict[str, float] = {}
-        self.ALERT_COOLDOWN = MoonshotDetectionConfig.ALERT_COOLDOWN  # 15 seconds (was 60)
+        # Peak flag only changes on the hour; cache it until the next boundary
+        self._is_peak = False
+        self._peak_valid_until = 0.0
+
+        # Cooldown tracking: symbol -> time the symbol may alert again
+        self.cooldown_until: Dict[str, float] = {}
+        self.ALERT_COOLDOWN = ALERT_COOLDOWN  # 15 seconds (was 60)
 
         # Stats
         self.alerts_generated = 0
@@ -85,17 +96,16 @@ class VelocityScanner:
 
     def _is_peak_hour(self) -> bool:
         """Check if current time is in peak moonshot hours (18:00-00:00 UTC)"""
-        current_hour = datetime.now(timezone.utc).hour
-        for start, end in self.PEAK_HOURS_UTC:
-            if start <= current_hour < end:
-                return True
-        return False
-
-    def _get_adjusted_threshold(self, base_threshold: float) -> float:
-        """Reduce threshold during peak hours"""
-        if self._is_peak_hour():
-            return base_threshold * (1 - self.PEAK_THRESHOLD_REDUCTION)
-        return base_threshold
+        now = time.time()
+        if now >= self._peak_valid_until:
+            current_hour = int(now // 3600) % 24  # Epoch seconds are UTC
+            self._is_peak = bool((self.PEAK_HOUR_MASK >> current_hour) & 1)
+            self._peak_valid_until = (now // 3600 + 1) * 3600
+        return self._is_peak
+
+    def _get_thresholds(self, is_peak: bool) -> Tuple[float, float, float]:
+        """Tier 1/2/3 thresholds for the current session (reduced during peak hours)"""
+        return self.TIER_THRESHOLDS_PEAK if is_peak else self.TIER_THRESHOLDS_OFFPEAK
 
     def on_ticker_update(self, symbol: str, price: float) -> Optional[VelocityAlert]:
         """
@@ -111,38 +121,58 @@ class VelocityScanner:
         if price <= 0:
             return None
 
+        is_peak = self._is_peak_hour()
+        return self._evaluate(symbol, price, time.time(), is_peak, self._get_thresholds(is_peak))
+
+    def on_ticker_batch(self, updates: List[Tuple[str, float]]) -> List[VelocityAlert]:
+        """
+        Evaluate every (symbol, price) pair from one all-market ticker message.
+        Clock, peak-hour flag and thresholds are resolved once for the whole batch.
+        """
         now = time.time()
-        self.snapshots_processed += 1
         is_peak = self._is_peak_hour()
+        thresholds = self._get_thresholds(is_peak)
+
+        alerts = []
+        for symbol, price in updates:
+            if price > 0:
+                alert = self._evaluate(symbol, price, now, is_peak, thresholds)
+                if alert:
+                    alerts.append(alert)
+        return alerts
+
+    def _evaluate(self, symbol: str, price: float, now: float, is_peak: bool,
+                  thresholds: Tuple[float, float, float]) -> Optional[VelocityAlert]:
+        """Record a snapshot and run the tier checks for one symbol"""
+        self.snapshots_processed += 1
 
         # Store snapshot
-        self.price_snapshots[symbol].append((now, price))
+        times = self.snapshot_times[symbol]
+        prices = self.snapshot_prices[symbol]
+        times.append(now)
+        prices.append(price)
 
         # Keep only last 15 minutes of data (900 seconds)
-        cutoff = now - 900
-        self.price_snapshots[symbol] = [
-            (t, p) for t, p in self.price_snapshots[symbol] if t > cutoff
-        ]
+        stale = bisect_right(times, now - 900)
+        if stale:
+            del times[:stale]
+            del prices[:stale]
 
         # Check cooldown (reduced to 15s for faster re-alerts)
-        if symbol in self.last_alerts:
-            if now - self.last_alerts[symbol] < self.ALERT_COOLDOWN:
-                return None
+        if now < self.cooldown_until.get(symbol, 0.0):
+            return None
 
-        # Calculate velocities for different timeframes
-        velocity_1m = self._calculate_velocity(symbol, 60)
-        velocity_5m = self._calculate_velocity(symbol, 300)
-        velocity_15m = self._calculate_velocity(symbol, 900)
+        # 5min velocity drives tiers 1-2; 1min/15min are only computed if those miss
+        velocity_5m = self._calculate_velocity(symbol, 300, now)
+        abs_velocity_5m = abs(velocity_5m)
 
-        # Get adjusted thresholds (reduced during peak hours)
-        tier1_threshold = self._get_adjusted_threshold(self.TIER1_VELOCITY_5MIN)
-        tier2_threshold = self._get_adjusted_threshold(self.TIER2_VELOCITY_5MIN)
-        tier3_threshold = self._get_adjusted_threshold(self.TIER3_VELOCITY_1MIN)
+        # Thresholds are pre-adjusted for peak hours by the caller
+        tier1_threshold, tier2_threshold, tier3_threshold = thresholds
 
         # Check TIER 1: INSTANT ENTRY (2.5%+ in 5min, bypasses ALL checks)
         alert = None
 
-        if abs(velocity_5m) >= tier1_threshold:
+        if abs_velocity_5m >= tier1_threshold:
             direction = "LONG" if velocity_5m > 0 else "SHORT"
             alert = VelocityAlert(
                 symbol=symbol,
@@ -159,7 +189,7 @@ class VelocityScanner:
             logger.warning(f"🚀🚀🚀 TIER 1 INSTANT [{symbol}]: {velocity_5m:+.1f}% in 5min - {direction} (BYPASS ALL)")
 
         # Check TIER 2: FAST ENTRY (1.5%+ in 5min)
-        elif abs(velocity_5m) >= tier2_threshold:
+        elif abs_velocity_5m >= tier2_threshold:
             direction = "LONG" if velocity_5m > 0 else "SHORT"
             alert = VelocityAlert(
                 symbol=symbol,
@@ -176,7 +206,7 @@ class VelocityScanner:
             logger.warning(f"🚀🚀 TIER 2 FAST [{symbol}]: {velocity_5m:+.1f}% in 5min - {direction}")
 
         # Check TIER 3: MICRO ENTRY (1.5%+ in 1min)
-        elif abs(velocity_1m) >= tier3_threshold:
+        elif abs(velocity_1m := self._calculate_velocity(symbol, 60, now)) >= tier3_threshold:
             direction = "LONG" if velocity_1m > 0 else "SHORT"
             alert = VelocityAlert(
                 symbol=symbol,
@@ -193,7 +223,7 @@ class VelocityScanner:
             logger.info(f"🚀 TIER 3 MICRO [{symbol}]: {velocity_1m:+.1f}% in 1min - {direction}")
 
         # Legacy thresholds (for backwards compatibility)
-        elif abs(velocity_15m) >= self.VELOCITY_15MIN:
+        elif abs(velocity_15m := self._calculate_velocity(symbol, 900, now)) >= self.VELOCITY_15MIN:
             direction = "LONG" if velocity_15m > 0 else "SHORT"
             alert = VelocityAlert(
                 symbol=symbol,
@@ -209,33 +239,35 @@ class VelocityScanner:
             logger.info(f"📈 VELOCITY ALERT [{symbol}]: {velocity_15m:+.1f}% in 15min - {direction}")
 
         if alert:
-            self.last_alerts[symbol] = now
+            self.cooldown_until[symbol] = now + self.ALERT_COOLDOWN
             self.alerts_generated += 1
 
         return alert
 
-    def _calculate_velocity(self, symbol: str, seconds: int) -> float:
+    def _calculate_velocity(self, symbol: str, seconds: int, now: Optional[float] = None) -> float:
         """Calculate price velocity over specified seconds"""
-        snapshots = self.price_snapshots.get(symbol, [])
+        times = self.snapshot_times.get(symbol)
 
-        if len(snapshots) < 2:
+        if not times or len(times) < 2:
             return 0.0
 
-        now = time.time()
+        if now is None:
+            now = time.time()
         cutoff = now - seconds
 
         # Find oldest price within timeframe
-        old_price = None
-        for t, p in snapshots:
-            if t >= cutoff:
-                old_price = p
-                break
+        idx = bisect_left(times, cutoff)
+        if idx == len(times):
+            return 0.0
+
+        prices = self.snapshot_prices[symbol]
+        old_price = prices[idx]
 
         if not old_price or old_price <= 0:
             return 0.0
 
         # Current price is the latest snapshot
-        current_price = snapshots[-1][1]
+        current_price = prices[-1]
 
         # Calculate percentage change
         velocity = ((current_price - old_price) / old_price) * 100
@@ -246,7 +278,7 @@ class VelocityScanner:
         """Get all symbols currently moving fast (for priority scanning)"""
         hot = []
 
-        for symbol in self.price_snapshots.keys():
+        for symbol in self.snapshot_times.keys():
             velocity_5m = abs(self._calculate_velocity(symbol, 300))
             if velocity_5m >= min_velocity:
                 hot.append((symbol, velocity_5m))
@@ -256,15 +288,15 @@ class VelocityScanner:
 
     def get_stats(self) -> dict:
         """Get scanner statistics"""
+        now = time.time()
         return {
-            "symbols_tracked": len(self.price_snapshots),
+            "symbols_tracked": len(self.snapshot_times),
             "snapshots_processed": self.snapshots_processed,
             "alerts_generated": self.alerts_generated,
             "tier1_alerts": self.tier1_alerts,
             "tier2_alerts": self.tier2_alerts,
             "tier3_alerts": self.tier3_alerts,
-            "symbols_in_cooldown": len([s for s, t in self.last_alerts.items()
-                                        if time.time() - t < self.ALERT_COOLDOWN]),
+            "symbols_in_cooldown": sum(1 for t in self.cooldown_until.values() if now < t),
             "is_peak_hour": self._is_peak_hour(),
             "alert_cooldown": self.ALERT_COOLDOWN
         }
@@ -275,14 +307,14 @@ class VelocityScanner:
         stale_cutoff = now - 1800  # 30 minutes
 
         stale_symbols = []
-        for symbol, snapshots in self.price_snapshots.items():
-            if not snapshots or snapshots[-1][0] < stale_cutoff:
+        for symbol, times in self.snapshot_times.items():
+            if not times or times[-1] < stale_cutoff:
                 stale_symbols.append(symbol)
 
         for symbol in stale_symbols:
-            del self.price_snapshots[symbol]
-            if symbol in self.last_alerts:
-                del self.last_alerts[symbol]
+            del self.snapshot_times[symbol]
+            self.snapshot_prices.pop(symbol, None)
+            self.cooldown_until.pop(symbol, None)
 
         if stale_symbols:
             logger.debug(f"Cleared {len(stale_symbols)} stale symbols from velocity scanner")